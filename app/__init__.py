@@ -1,89 +1,149 @@
-# app/__init__.py
-from flask import Flask, render_template, send_from_directory, current_app
-import os
-
-def create_app(test_config=None):
-    # Crea y configura la aplicación Flask
-    app = Flask(__name__, instance_relative_config=True)
-    
-    # Configuración por defecto
-    app.config.from_mapping(
-        SECRET_KEY='dev',
-        DATABASE=os.path.join(app.instance_path, 'app.db'),
-        MEDIA_FOLDER=os.path.join(app.root_path, 'media'),
-        COVERS_FOLDER=os.path.join(app.root_path, 'static', 'covers'),
-    )
-
-    if test_config is None:
-        # Carga config.py si existe (cuando no estamos en test)
-        app.config.from_pyfile('config.py', silent=True)
-    else:
-        # Si es test, aplica el diccionario de configuración
-        if isinstance(test_config, dict):
-            app.config.from_mapping(test_config)
-
-    # Asegura que la carpeta 'instance' existe
-    try:
-        os.makedirs(app.instance_path, exist_ok=True) 
-    except OSError:
-        pass
-
-    # Asegura que las carpetas de media y covers existen
-    try:
-        os.makedirs(app.config['MEDIA_FOLDER'], exist_ok=True)
-        os.makedirs(app.config['COVERS_FOLDER'], exist_ok=True)
-    except OSError:
-        pass
-
-    # Ruta principal → renderiza el index.html
-    @app.route('/')
-    def index():
-        return render_template('index.html')
-
-    # 🔥 Ruta para servir los parciales del SPA
-    @app.route('/partials/<path:filename>')
-    def serve_partial(filename):
-        return render_template(f'partials/{filename}')
-
-    # === Registra la base de datos ===
-    from .core import db
-    db.init_app(app)
-
-    # === Registra los Blueprints (APIs) ===
-    from .api import songs
-    app.register_blueprint(songs.bp)
-
-    from .api import plays
-    app.register_blueprint(plays.bp)
-
-    from .api import player
-    app.register_blueprint(player.bp)
-
-    from .api import playlists
-    app.register_blueprint(playlists.bp)
-
-    from .api import stats
-    app.register_blueprint(stats.bp)
-
-    from .api import discord
-    app.register_blueprint(discord.bp)
-
-    from .api import downloads
-    app.register_blueprint(downloads.bp)
-
-    from .api import recs
-    app.register_blueprint(recs.bp)
-
-    # --- 👇 LÍNEAS NUEVAS ---
-    from .api import settings
-    app.register_blueprint(settings.bp)
-    # --- 👆 FIN DE LAS LÍNEAS ---
-
-    # 🔥 Ruta para servir los archivos de música
-    @app.route('/media/<path:filename>')
-    def serve_media(filename):
-        media_folder = current_app.config['MEDIA_FOLDER']
-        return send_from_directory(media_folder, filename)
-    # -------------------------
-
-    return app
+# app/__init__.py
+from flask import Flask, render_template
+import os
+import sqlite3
+
+def create_app(test_config=None):
+    # Crea y configura la aplicación Flask
+    app = Flask(__name__, instance_relative_config=True)
+    
+    # Configuración por defecto
+    app.config.from_mapping(
+        SECRET_KEY='dev',
+        DATABASE=os.path.join(app.instance_path, 'app.db'),
+        MEDIA_FOLDER=os.path.join(app.root_path, 'media'),
+        COVERS_FOLDER=os.path.join(app.root_path, 'static', 'covers'),
+        SONG_CACHE_SIZE=1024, # Nº máximo de canciones guardadas en la caché en memoria (0 = desactivada)
+        IMPORT_WORKERS=min(8, os.cpu_count() or 1), # Hilos que analizan etiquetas y portadas al importar
+        LIBRARY_WATCH_DIR=None, # Carpeta de música que se vigila e importa sola (None = desactivado)
+        LIBRARY_WATCH_INTERVAL=300, # Segundos entre escaneos de esa carpeta
+        COVER_GC_INTERVAL=600, # Segundos entre barridos de portadas sin usar
+        COVER_GC_GRACE=300, # Segundos que una portada sin usar se conserva antes de borrarla
+        MEDIA_MAX_AGE=365 * 24 * 3600, # Segundos que el navegador guarda un MP3 pedido con ?v=<hash>
+        TRANSCODE_FOLDER=os.path.join(app.instance_path, 'transcodes'), # Caché de /media/<id>?bitrate=&format=
+        TRANSCODE_CACHE_SIZE=2 * 1024 ** 3, # Bytes máximos de esa caché (se borran los menos usados)
+        FFMPEG_BINARY='ffmpeg', # Ejecutable de ffmpeg para transcodificar y medir el volumen
+        CHECKPOINT_FLUSH_SIZE=200, # Checkpoints de escucha pendientes que fuerzan un guardado
+        CHECKPOINT_FLUSH_INTERVAL=2.0, # Segundos máximos que un checkpoint espera a guardarse
+        CHECKPOINT_BUFFER_MAX=10000, # Checkpoints pendientes como mucho (si la base de datos no responde)
+    )
+
+    if test_config is None:
+        # Carga config.py si existe (cuando no estamos en test)
+        app.config.from_pyfile('config.py', silent=True)
+    else:
+        # Si es test, aplica el diccionario de configuración
+        if isinstance(test_config, dict):
+            app.config.from_mapping(test_config)
+
+    # Asegura que la carpeta 'instance' existe
+    try:
+        os.makedirs(app.instance_path, exist_ok=True) 
+    except OSError:
+        pass
+
+    # Asegura que las carpetas de media y covers existen
+    try:
+        os.makedirs(app.config['MEDIA_FOLDER'], exist_ok=True)
+        os.makedirs(app.config['COVERS_FOLDER'], exist_ok=True)
+    except OSError:
+        pass
+
+    # Ruta principal → renderiza el index.html
+    @app.route('/')
+    def index():
+        return render_template('index.html')
+
+    # 🔥 Ruta para servir los parciales del SPA
+    @app.route('/partials/<path:filename>')
+    def serve_partial(filename):
+        return render_template(f'partials/{filename}')
+
+    # === Las subidas de MP3 se escriben directamente en 'media/.staging' ===
+    from .core.files import StagingRequest, discard_request_staging_files
+    app.request_class = StagingRequest
+    app.teardown_request(discard_request_staging_files)
+
+    # === Registra la base de datos ===
+    from .core import db
+    db.init_app(app)
+
+    # === Versiones de los datos (ETag) compartidas con los comandos de la CLI ===
+    from .core import versions
+    versions.init_app(app)
+
+    # === Comando `flask scan-library` para importar desde una carpeta ===
+    from .core import scanner
+    scanner.init_app(app)
+
+    # === Comando `flask gc-covers` para borrar las portadas sin usar ===
+    from .core import cover_gc
+    cover_gc.init_app(app)
+
+    # === Comando `flask analyze-loudness` para medir el volumen de las canciones ===
+    from .core import loudness
+    loudness.init_app(app)
+
+    # === Caché de canciones compartida por los endpoints ===
+    from .core.song_cache import song_cache
+    song_cache.configure(app.config['SONG_CACHE_SIZE'])
+
+    # === Buffer de checkpoints de escucha (se guardan por lotes) ===
+    from .core.checkpoints import checkpoint_buffer
+    checkpoint_buffer.configure(app)
+
+    # === Índice en memoria para las sugerencias de búsqueda ===
+    from .core.typeahead import typeahead_index
+    with app.app_context():
+        try:
+            typeahead_index.load(db.get_db())
+        except sqlite3.Error as e:
+            # Base de datos sin inicializar: el índice empieza vacío
+            print(f"No se pudo cargar el índice de sugerencias: {e}")
+
+    # === Registra los Blueprints (APIs) ===
+    from .api import songs
+    app.register_blueprint(songs.bp)
+
+    from .api import plays
+    app.register_blueprint(plays.bp)
+
+    from .api import player
+    app.register_blueprint(player.bp)
+
+    from .api import playlists
+    app.register_blueprint(playlists.bp)
+
+    from .api import stats
+    app.register_blueprint(stats.bp)
+
+    from .api import discord
+    app.register_blueprint(discord.bp)
+
+    from .api import downloads
+    app.register_blueprint(downloads.bp)
+
+    from .api import recs
+    app.register_blueprint(recs.bp)
+
+    # --- 👇 LÍNEAS NUEVAS ---
+    from .api import settings
+    app.register_blueprint(settings.bp)
+    # --- 👆 FIN DE LAS LÍNEAS ---
+
+    # 🔥 Ruta para servir los archivos de música (con Range, ETag y caché: ver app/core/media.py)
+    from .core.media import send_media_file
+
+    @app.route('/media/<path:filename>')
+    def serve_media(filename):
+        return send_media_file(filename)
+
+    # Por id: el MP3 original o, con ?bitrate=&format=, transcodificado (ver app/core/transcode.py)
+    from .core.transcode import send_transcoded_song
+
+    @app.route('/media/<int:song_id>')
+    def serve_song_media(song_id):
+        return send_transcoded_song(song_id)
+    # -------------------------
+
+    return app
@@ -1,166 +1,166 @@
-# app/api/downloads.py
-# Este archivo ha sido modificado para desactivar la funcionalidad de descarga.
-# Contiene lo mínimo para que la aplicación arranque y la interfaz de descarga
-# pueda mostrar un mensaje de error controlado al usuario.
-
-from flask import Blueprint, request, jsonify
-
-# Creamos el Blueprint para que la aplicación no falle al registrarlo.
-bp = Blueprint('downloads', __name__, url_prefix='/api/downloads')
-
-@bp.route('/start', methods=['POST'])
-def start_download_job_disabled():
-    """
-    Endpoint que informa al usuario que la funcionalidad de descarga está desactivada.
-    """
-    # Devolvemos un error 501 "Not Implemented".
-    return jsonify({
-        "error": "La funcionalidad de descarga no está disponible en esta versión de la aplicación."
-    }), 501
-
-@bp.route('/status/session', methods=['GET'])
-def get_session_job_status_disabled():
-    """
-    Devuelve una cola vacía, ya que no hay trabajos de descarga.
-    """
-    return jsonify({"urls": []})
-
-@bp.route('/retry', methods=['POST'])
-def retry_failed_downloads_disabled():
-    """
-    Endpoint desactivado.
-    """
-    return jsonify({
-        "error": "La funcionalidad de descarga no está disponible en esta versión de la aplicación."
-    }), 501
-
-
-
-"""
-Módulo: downloads.py
----------------------
-Este módulo expone un conjunto de endpoints Flask bajo el prefijo `/api/downloads`.
-Su objetivo es gestionar la lógica de "trabajos de descarga" mediante colas en memoria
-y workers que se ejecutan en hilos.
-
-Arquitectura principal:
-- JOBS: diccionario global que guarda el estado de cada job.
-- JOBS_LOCK: mutex para asegurar acceso concurrente seguro.
-- Cada job contiene:
-  - id: identificador único.
-  - quality_kbps: bitrate objetivo para los MP3.
-  - urls: lista de items (cada item = una URL + estado).
-  - is_running: flag que indica si hay un worker activo.
-
-Dependencias habituales:
-- Flask (Blueprint, request, jsonify, session, current_app).
-- threading (para hilos).
-- uuid (generación de IDs únicos).
-- re (expresiones regulares para extraer URLs).
-- yt (módulo auxiliar, por ejemplo yt.py).
-- metadata y files (módulos auxiliares para leer metadatos y guardar archivos).
-- PIL (para manipular imágenes de portadas).
-- shutil, os, io (gestión de archivos y directorios).
-
--------------------------------------------------------------
-Función: download_worker(job_id, app_context)
--------------------------------------------------------------
-- Es un hilo que se encarga de procesar secuencialmente todos los items
-  en estado 'pending' de un job.
-- Flujo:
-  1. Obtener el contexto de aplicación Flask.
-  2. Mientras haya items pendientes:
-     - Cambiar estado de un item a 'queued'.
-     - Extraer información preliminar (preview) con yt_dlp en modo metadata-only.
-     - Actualizar título, duración y miniatura.
-     - Iniciar descarga real usando yt.download_audio(url, quality, progress_hook).
-     - El progress_hook debe:
-         * actualizar progreso en porcentaje.
-         * cambiar estados ('downloading', 'processing', etc.).
-     - Una vez descargado:
-         * Extraer metadatos de MP3 (título, artista, álbum, duración...).
-         * Si hay carátula, redimensionarla y guardarla en DB como "cover".
-         * Asignar un nuevo ID de canción, mover archivo a carpeta MEDIA_FOLDER.
-         * Insertar registro en DB con los datos de la canción.
-         * Marcar item como 'completed'.
-     - Si algo falla:
-         * Marcar item como 'failed' y registrar error.
-  3. Si ya no quedan 'pending', marcar job['is_running'] = False y salir.
-
--------------------------------------------------------------
-Endpoint: POST /api/downloads/start
--------------------------------------------------------------
-- Entrada: JSON con:
-  - "urls_text": string con una o varias URLs separadas por espacios o saltos de línea.
-  - "quality_kbps": (opcional) bitrate objetivo, default "192".
-- Flujo:
-  1. Extraer URLs mediante regex.
-  2. Para cada URL, llamar a yt.extract_urls_from_playlist(url).
-     - Expande playlists a múltiples URLs individuales.
-  3. Si no hay URLs válidas → devolver error 400.
-  4. Si ya hay un job en la sesión:
-     - Añadir solo URLs nuevas (evitar duplicados).
-  5. Si no hay job:
-     - Crear job nuevo con UUID.
-     - Guardar en session['download_job_id'].
-     - Inicializar estructura en JOBS.
-  6. Si no hay worker activo:
-     - Lanzar un thread con download_worker.
-  7. Devolver JSON con el job_id.
-
--------------------------------------------------------------
-Endpoint: POST /api/downloads/retry
--------------------------------------------------------------
-- Permite reintentar descargas fallidas.
-- Flujo:
-  1. Obtener job_id de la sesión.
-  2. Si no existe → devolver error 404.
-  3. Iterar sobre job['urls']:
-     - Si estado == 'failed':
-         * Resetear a 'pending'.
-         * Resetear progress y error.
-  4. Si no había fallos → mensaje "No hay descargas fallidas".
-  5. Si había fallos y no hay worker activo:
-     - Reactivar worker (nuevo thread con download_worker).
-     - Marcar job['is_running'] = True.
-  6. Responder con mensaje de reintento iniciado.
-
--------------------------------------------------------------
-Endpoint: GET /api/downloads/status/session
--------------------------------------------------------------
-- Devuelve el estado completo del job actual de la sesión.
-- Flujo:
-  1. Leer job_id de la sesión.
-  2. Si no hay job_id o job_id no está en JOBS:
-     - Devolver {"urls": []}.
-  3. Si existe:
-     - Devolver objeto completo job (urls + estados).
-
--------------------------------------------------------------
-Estados de un item en la cola
--------------------------------------------------------------
-- pending: aún no procesado.
-- queued: en espera de empezar descarga.
-- downloading: bytes descargándose, progreso numérico.
-- processing: postprocesando (conversión a MP3, metadatos, portada).
-- completed: terminado con éxito.
-- failed: error en preview, descarga o postprocesado.
-
--------------------------------------------------------------
-Notas de diseño
--------------------------------------------------------------
-- El worker se ejecuta en segundo plano y gestiona su propia cola.
-- Se usan locks para evitar condiciones de carrera.
-- La DB se actualiza con commits por cada canción procesada.
-- Se almacenan portadas redimensionadas en carpeta 'static/covers'.
-- El diseño es modular:
-  * yt.py se encarga de la lógica de extracción/descarga.
-  * metadata.py se encarga de leer ID3 y carátulas.
-  * files.py se encarga de IDs, nombres de archivo y guardado físico.
-- El blueprint 'downloads' encapsula todo bajo /api/downloads.
-
--------------------------------------------------------------
-Este archivo no contiene implementación ejecutable en el repositorio público
-por motivos de licencia, pero la lógica está descrita con detalle suficiente
-para ser recreada fácilmente por un desarrollador.
-"""
+# app/api/downloads.py
+# Este archivo ha sido modificado para desactivar la funcionalidad de descarga.
+# Contiene lo mínimo para que la aplicación arranque y la interfaz de descarga
+# pueda mostrar un mensaje de error controlado al usuario.
+
+from flask import Blueprint, request, jsonify
+
+# Creamos el Blueprint para que la aplicación no falle al registrarlo.
+bp = Blueprint('downloads', __name__, url_prefix='/api/downloads')
+
+@bp.route('/start', methods=['POST'])
+def start_download_job_disabled():
+    """
+    Endpoint que informa al usuario que la funcionalidad de descarga está desactivada.
+    """
+    # Devolvemos un error 501 "Not Implemented".
+    return jsonify({
+        "error": "La funcionalidad de descarga no está disponible en esta versión de la aplicación."
+    }), 501
+
+@bp.route('/status/session', methods=['GET'])
+def get_session_job_status_disabled():
+    """
+    Devuelve una cola vacía, ya que no hay trabajos de descarga.
+    """
+    return jsonify({"urls": []})
+
+@bp.route('/retry', methods=['POST'])
+def retry_failed_downloads_disabled():
+    """
+    Endpoint desactivado.
+    """
+    return jsonify({
+        "error": "La funcionalidad de descarga no está disponible en esta versión de la aplicación."
+    }), 501
+
+
+
+"""
+Módulo: downloads.py
+---------------------
+Este módulo expone un conjunto de endpoints Flask bajo el prefijo `/api/downloads`.
+Su objetivo es gestionar la lógica de "trabajos de descarga" mediante colas en memoria
+y workers que se ejecutan en hilos.
+
+Arquitectura principal:
+- JOBS: diccionario global que guarda el estado de cada job.
+- JOBS_LOCK: mutex para asegurar acceso concurrente seguro.
+- Cada job contiene:
+  - id: identificador único.
+  - quality_kbps: bitrate objetivo para los MP3.
+  - urls: lista de items (cada item = una URL + estado).
+  - is_running: flag que indica si hay un worker activo.
+
+Dependencias habituales:
+- Flask (Blueprint, request, jsonify, session, current_app).
+- threading (para hilos).
+- uuid (generación de IDs únicos).
+- re (expresiones regulares para extraer URLs).
+- yt (módulo auxiliar, por ejemplo yt.py).
+- metadata y files (módulos auxiliares para leer metadatos y guardar archivos).
+- PIL (para manipular imágenes de portadas).
+- shutil, os, io (gestión de archivos y directorios).
+
+-------------------------------------------------------------
+Función: download_worker(job_id, app_context)
+-------------------------------------------------------------
+- Es un hilo que se encarga de procesar secuencialmente todos los items
+  en estado 'pending' de un job.
+- Flujo:
+  1. Obtener el contexto de aplicación Flask.
+  2. Mientras haya items pendientes:
+     - Cambiar estado de un item a 'queued'.
+     - Extraer información preliminar (preview) con yt_dlp en modo metadata-only.
+     - Actualizar título, duración y miniatura.
+     - Iniciar descarga real usando yt.download_audio(url, quality, progress_hook).
+     - El progress_hook debe:
+         * actualizar progreso en porcentaje.
+         * cambiar estados ('downloading', 'processing', etc.).
+     - Una vez descargado:
+         * Extraer metadatos de MP3 (título, artista, álbum, duración...).
+         * Si hay carátula, redimensionarla y guardarla en DB como "cover".
+         * Asignar un nuevo ID de canción, mover archivo a carpeta MEDIA_FOLDER.
+         * Insertar registro en DB con los datos de la canción.
+         * Marcar item como 'completed'.
+     - Si algo falla:
+         * Marcar item como 'failed' y registrar error.
+  3. Si ya no quedan 'pending', marcar job['is_running'] = False y salir.
+
+-------------------------------------------------------------
+Endpoint: POST /api/downloads/start
+-------------------------------------------------------------
+- Entrada: JSON con:
+  - "urls_text": string con una o varias URLs separadas por espacios o saltos de línea.
+  - "quality_kbps": (opcional) bitrate objetivo, default "192".
+- Flujo:
+  1. Extraer URLs mediante regex.
+  2. Para cada URL, llamar a yt.extract_urls_from_playlist(url).
+     - Expande playlists a múltiples URLs individuales.
+  3. Si no hay URLs válidas → devolver error 400.
+  4. Si ya hay un job en la sesión:
+     - Añadir solo URLs nuevas (evitar duplicados).
+  5. Si no hay job:
+     - Crear job nuevo con UUID.
+     - Guardar en session['download_job_id'].
+     - Inicializar estructura en JOBS.
+  6. Si no hay worker activo:
+     - Lanzar un thread con download_worker.
+  7. Devolver JSON con el job_id.
+
+-------------------------------------------------------------
+Endpoint: POST /api/downloads/retry
+-------------------------------------------------------------
+- Permite reintentar descargas fallidas.
+- Flujo:
+  1. Obtener job_id de la sesión.
+  2. Si no existe → devolver error 404.
+  3. Iterar sobre job['urls']:
+     - Si estado == 'failed':
+         * Resetear a 'pending'.
+         * Resetear progress y error.
+  4. Si no había fallos → mensaje "No hay descargas fallidas".
+  5. Si había fallos y no hay worker activo:
+     - Reactivar worker (nuevo thread con download_worker).
+     - Marcar job['is_running'] = True.
+  6. Responder con mensaje de reintento iniciado.
+
+-------------------------------------------------------------
+Endpoint: GET /api/downloads/status/session
+-------------------------------------------------------------
+- Devuelve el estado completo del job actual de la sesión.
+- Flujo:
+  1. Leer job_id de la sesión.
+  2. Si no hay job_id o job_id no está en JOBS:
+     - Devolver {"urls": []}.
+  3. Si existe:
+     - Devolver objeto completo job (urls + estados).
+
+-------------------------------------------------------------
+Estados de un item en la cola
+-------------------------------------------------------------
+- pending: aún no procesado.
+- queued: en espera de empezar descarga.
+- downloading: bytes descargándose, progreso numérico.
+- processing: postprocesando (conversión a MP3, metadatos, portada).
+- completed: terminado con éxito.
+- failed: error en preview, descarga o postprocesado.
+
+-------------------------------------------------------------
+Notas de diseño
+-------------------------------------------------------------
+- El worker se ejecuta en segundo plano y gestiona su propia cola.
+- Se usan locks para evitar condiciones de carrera.
+- La DB se actualiza con commits por cada canción procesada.
+- Se almacenan portadas redimensionadas en carpeta 'static/covers'.
+- El diseño es modular:
+  * yt.py se encarga de la lógica de extracción/descarga.
+  * metadata.py se encarga de leer ID3 y carátulas.
+  * files.py se encarga de IDs, nombres de archivo y guardado físico.
+- El blueprint 'downloads' encapsula todo bajo /api/downloads.
+
+-------------------------------------------------------------
+Este archivo no contiene implementación ejecutable en el repositorio público
+por motivos de licencia, pero la lógica está descrita con detalle suficiente
+para ser recreada fácilmente por un desarrollador.
+"""
@@ -1,54 +1,119 @@
-# app/api/plays.py
-from flask import Blueprint, request, jsonify
-from app.core.db import get_db
-
-bp = Blueprint('plays', __name__, url_prefix='/api/plays')
-
-# @bp.route('/', methods=['POST'])
-# def register_play():
-#     """
-#     POST /api/plays
-#     Registra una nueva reproducción para una canción.
-#     Recibe: { "song_id": <id> }
-#     """
-#     data = request.get_json()
-#     song_id = data.get('song_id')
-
-#     if not song_id:
-#         return jsonify({'error': 'Song ID is required'}), 400
-
-#     db = get_db()
-#     try:
-#         db.execute("INSERT INTO play (song_id) VALUES (?)", (song_id,))
-#         db.commit()
-#     except db.IntegrityError:
-#         # Esto podría pasar si el song_id no existe, aunque es poco probable.
-#         return jsonify({'error': 'Invalid song_id'}), 400
-    
-#     return jsonify({'message': 'Play registered successfully'}), 201
-
-# --- ✅ NUEVA RUTA PARA LOS CHECKPOINTS ---
-@bp.route('/checkpoint', methods=['POST'])
-def register_checkpoint():
-    """
-    POST /api/plays/checkpoint
-    Registra un fragmento de tiempo escuchado para una canción.
-    Recibe: { "song_id": <id>, "ms_played": <milisegundos> }
-    """
-    data = request.get_json()
-    song_id = data.get('song_id')
-    ms_played = data.get('ms_played')
-
-    if not song_id or ms_played is None:
-        return jsonify({'error': 'song_id and ms_played are required'}), 400
-
-    db = get_db()
-    try:
-        db.execute(
-            "INSERT INTO play_checkpoint (song_id, ms_played) VALUES (?, ?)",
-            (song_id, int(ms_played))
-        )
-        db.commit()
-        return jsonify({'message': 'Checkpoint registered'}), 201
-    except db.Error as e:
-        return jsonify({'error': str(e)}), 500
+# app/api/plays.py
+from flask import Blueprint, request, jsonify
+from app.core.checkpoints import checkpoint_buffer, parse_client_id, parse_played_at, utc_timestamp, valid_checkpoint, INSERT_CHECKPOINT_QUERY
+from app.core.db import get_db
+from app.core.versions import bump_version
+
+bp = Blueprint('plays', __name__, url_prefix='/api/plays')
+
+# @bp.route('/', methods=['POST'])
+# def register_play():
+#     """
+#     POST /api/plays
+#     Registra una nueva reproducción para una canción.
+#     Recibe: { "song_id": <id> }
+#     """
+#     data = request.get_json()
+#     song_id = data.get('song_id')
+
+#     if not song_id:
+#         return jsonify({'error': 'Song ID is required'}), 400
+
+#     db = get_db()
+#     try:
+#         db.execute("INSERT INTO play (song_id) VALUES (?)", (song_id,))
+#         db.commit()
+#     except db.IntegrityError:
+#         # Esto podría pasar si el song_id no existe, aunque es poco probable.
+#         return jsonify({'error': 'Invalid song_id'}), 400
+    
+#     return jsonify({'message': 'Play registered successfully'}), 201
+
+# --- ✅ NUEVA RUTA PARA LOS CHECKPOINTS ---
+@bp.route('/checkpoint', methods=['POST'])
+def register_checkpoint():
+    """
+    POST /api/plays/checkpoint
+    Registra un fragmento de tiempo escuchado para una canción.
+    Recibe: { "song_id": <id>, "ms_played": <milisegundos>, "client_id": <opcional, p.ej. un UUID> }
+    Un checkpoint con un client_id que ya está guardado se ignora (ver la migración 0011).
+    Se guarda en segundo plano junto con otros (ver app/core/checkpoints.py), así que
+    responde 202 sin esperar a la base de datos.
+    """
+    data = request.get_json()
+    song_id = data.get('song_id')
+    ms_played = data.get('ms_played')
+
+    if song_id is None or ms_played is None:
+        return jsonify({'error': 'song_id and ms_played are required'}), 400
+    if not valid_checkpoint(song_id, ms_played):
+        return jsonify({'error': 'song_id and ms_played must be integers between 1 and 2^63-1'}), 400
+    try:
+        client_id = parse_client_id(data.get('client_id'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if checkpoint_buffer.add(song_id, ms_played, client_id=client_id) is None:
+        # El cliente lo guarda y lo vuelve a mandar más tarde
+        return jsonify({'error': 'Too many checkpoints pending, try again later'}), 503
+    return jsonify({'message': 'Checkpoint accepted'}), 202
+
+# Checkpoints que se aceptan como mucho en una petición a /checkpoints (más de 4 horas de escucha)
+MAX_BULK_CHECKPOINTS = 1000
+
+@bp.route('/checkpoints', methods=['POST'])
+def register_checkpoints():
+    """
+    POST /api/plays/checkpoints
+    Registra varios checkpoints de una vez, con la fecha en que se escucharon según el cliente
+    (p.ej. los que se guardó mientras no tenía conexión).
+    Recibe: [ { "song_id": <id>, "ms_played": <milisegundos>, "played_at": <ISO 8601 o ms>, "client_id": <opcional> }, ... ]
+    Sin `played_at` se usa la fecha actual. Todos se guardan con un solo executemany y commit;
+    se omiten los de canciones que ya no existen y los que tienen un client_id ya guardado
+    (el cliente puede reenviarlos sin miedo a contarlos dos veces).
+    """
+    records = request.get_json(silent=True)
+    if not isinstance(records, list) or not records:
+        return jsonify({'error': 'Expected a non-empty array of checkpoints'}), 400
+    if len(records) > MAX_BULK_CHECKPOINTS:
+        return jsonify({'error': f'At most {MAX_BULK_CHECKPOINTS} checkpoints per request'}), 400
+
+    rows = []
+    now = utc_timestamp()
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            return jsonify({'error': f'Checkpoint {index} must be an object'}), 400
+        try:
+            song_id, ms_played = record['song_id'], record['ms_played']
+            played_at = parse_played_at(record['played_at']) if record.get('played_at') is not None else now
+            client_id = parse_client_id(record.get('client_id'))
+        except KeyError:
+            return jsonify({'error': f'Checkpoint {index}: song_id and ms_played are required'}), 400
+        except (TypeError, ValueError, OverflowError) as e:
+            return jsonify({'error': f'Checkpoint {index}: {e}'}), 400
+        if not valid_checkpoint(song_id, ms_played):
+            return jsonify({'error': f'Checkpoint {index}: song_id and ms_played must be integers between 1 and 2^63-1'}), 400
+        rows.append((song_id, ms_played, played_at, client_id, song_id))
+
+    db = get_db()
+    try:
+        changes_before = db.total_changes
+        db.executemany(INSERT_CHECKPOINT_QUERY, rows)
+        inserted = db.total_changes - changes_before
+        if inserted:
+            bump_version(db, 'stats')
+        db.commit()
+    except db.Error as e:
+        db.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({'inserted': inserted, 'skipped': len(rows) - inserted}), 201
+
+@bp.route('/buffer', methods=['GET'])
+def get_checkpoint_buffer_stats():
+    """
+    GET /api/plays/buffer
+    Devuelve los checkpoints pendientes de guardar y lo que tardan los guardados,
+    para poder ajustar CHECKPOINT_FLUSH_SIZE y CHECKPOINT_FLUSH_INTERVAL.
+    """
+    return jsonify(checkpoint_buffer.stats())
@@ -0,0 +1,262 @@
+# app/core/checkpoints.py
+import atexit
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from app.core.db import get_db
+from app.core.versions import bump_version
+
+# Cada oyente manda un checkpoint (15 s escuchados) cada 15 segundos. Antes cada uno era un
+# INSERT y un commit (una escritura a disco y el lock de escritura de SQLite) por petición.
+# Ahora la petición solo lo deja en este buffer y responde; un hilo los guarda todos juntos,
+# en una transacción, cuando hay CHECKPOINT_FLUSH_SIZE o cada CHECKPOINT_FLUSH_INTERVAL segundos.
+# - La fecha (created_at) es la de la petición, no la del guardado.
+# - Al cerrar el servidor se guarda lo que quede pendiente (atexit).
+# - Si el guardado falla porque la base de datos no está disponible (bloqueada, disco lleno...:
+#   sqlite3.OperationalError), los checkpoints vuelven al buffer y se reintenta en la siguiente
+#   vuelta. Con cualquier otro error se guardan de uno en uno y se descartan los que fallan,
+#   para que un checkpoint malo no bloquee a todos los demás.
+# - El buffer guarda como mucho CHECKPOINT_BUFFER_MAX; lo que no cabe se descarta (y se cuenta).
+# - GET /api/plays/buffer devuelve los pendientes y lo que tardan los guardados.
+
+# Solo se guardan los checkpoints de canciones que siguen existiendo (pudo borrarse mientras esperaba).
+# Los que ya están guardados con el mismo client_id se ignoran (reenvíos del cliente, migración 0011).
+INSERT_CHECKPOINT_QUERY = (
+    "INSERT OR IGNORE INTO play_checkpoint (song_id, ms_played, created_at, client_id)"
+    " SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM song WHERE id = ?)"
+)
+
+
+# Margen para los relojes de los clientes que van un poco adelantados
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+# El entero más grande que cabe en una columna INTEGER de SQLite
+MAX_SQLITE_INTEGER = 2 ** 63 - 1
+
+
+# Longitud máxima del identificador que pone el cliente a cada checkpoint (un UUID tiene 36)
+MAX_CLIENT_ID_LENGTH = 64
+
+
+def _valid_integer(value):
+    # bool es un int en Python, y 1.7 o "20" no se convierten: el cliente manda enteros JSON
+    return isinstance(value, int) and not isinstance(value, bool) and 0 < value <= MAX_SQLITE_INTEGER
+
+
+def valid_checkpoint(song_id, ms_played):
+    """True si song_id y ms_played son enteros (no bool, float ni texto) positivos que caben en SQLite."""
+    return _valid_integer(song_id) and _valid_integer(ms_played)
+
+
+def parse_client_id(value):
+    """Valida el `client_id` opcional de un checkpoint. Lanza ValueError si no es válido."""
+    if value is None:
+        return None
+    if not isinstance(value, str) or not value or len(value) > MAX_CLIENT_ID_LENGTH:
+        raise ValueError(f'client_id must be a string of at most {MAX_CLIENT_ID_LENGTH} characters')
+    return value
+
+
+def utc_timestamp():
+    """La fecha actual con el mismo formato que CURRENT_TIMESTAMP de SQLite (UTC)."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def parse_played_at(value):
+    """
+    Convierte la fecha de un checkpoint enviada por el cliente al formato de `created_at` (UTC).
+    Acepta ISO 8601 (p.ej. '2024-05-01T18:30:00Z'; sin zona horaria se toma como UTC) o
+    milisegundos desde 1970 (Date.now() en JavaScript). Lanza ValueError si no es válida
+    o si está en el futuro.
+    """
+    if isinstance(value, bool):
+        raise ValueError('invalid date')
+    if isinstance(value, (int, float)):
+        try:
+            played_at = datetime.fromtimestamp(value / 1000, timezone.utc)
+        except (OverflowError, OSError):
+            raise ValueError('date out of range')
+    elif isinstance(value, str):
+        played_at = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        if played_at.tzinfo is None:
+            played_at = played_at.replace(tzinfo=timezone.utc)
+    else:
+        raise ValueError('invalid date')
+    if played_at > datetime.now(timezone.utc) + MAX_CLOCK_SKEW:
+        raise ValueError('date is in the future')
+    return played_at.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class CheckpointBuffer:
+    """
+    Buffer en memoria de checkpoints pendientes de guardar, compartido por todos los hilos.
+    El hilo que los guarda se arranca con el primer checkpoint.
+    """
+
+    def __init__(self, flush_size=200, flush_interval=2.0, max_pending=10000):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.app = None
+        self._rows = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()  # Un guardado cada vez (el hilo o el cierre)
+        self._thread = None
+        # Contadores
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+        self.last_flush_ms = None
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        self.last_error = None
+
+    def configure(self, app):
+        """Asocia la aplicación (su base de datos) y los umbrales de CHECKPOINT_FLUSH_SIZE/INTERVAL/BUFFER_MAX."""
+        with self._lock:
+            self.app = app
+            self.flush_size = app.config['CHECKPOINT_FLUSH_SIZE']
+            self.flush_interval = app.config['CHECKPOINT_FLUSH_INTERVAL']
+            self.max_pending = app.config['CHECKPOINT_BUFFER_MAX']
+
+    def add(self, song_id, ms_played, created_at=None, client_id=None):
+        """
+        Deja un checkpoint pendiente de guardar. Devuelve cuántos hay pendientes, o None si
+        el buffer está lleno y se ha descartado.
+        """
+        with self._lock:
+            if len(self._rows) >= self.max_pending:
+                self.dropped_rows += 1
+                return None
+            self._rows.append((song_id, ms_played, created_at or utc_timestamp(), client_id, song_id))
+            pending = len(self._rows)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                atexit.register(self._flush_at_exit)
+            if pending >= self.flush_size:
+                self._wakeup.notify()
+        return pending
+
+    def flush(self):
+        """Guarda ahora todos los checkpoints pendientes en una transacción. Devuelve cuántos se han guardado."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                with self.app.app_context():
+                    db = get_db()
+                    try:
+                        dropped = self._insert_rows(db, rows)
+                        if dropped < len(rows):
+                            bump_version(db, 'stats')
+                        db.commit()
+                    except Exception:
+                        db.rollback()
+                        raise
+            except sqlite3.OperationalError as e:
+                # Vuelven al principio del buffer, en su orden, para el siguiente intento
+                with self._lock:
+                    self._rows[:0] = rows
+                    if len(self._rows) > self.max_pending:
+                        # Los más antiguos son los que sobran
+                        overflow = len(self._rows) - self.max_pending
+                        del self._rows[:overflow]
+                        self.dropped_rows += overflow
+                    self.failed_flushes += 1
+                    self.last_error = str(e)
+                raise
+            except Exception as e:
+                # No es culpa de la base de datos ni de una fila: reintentarlo fallaría igual
+                with self._lock:
+                    self.dropped_rows += len(rows)
+                    self.failed_flushes += 1
+                    self.last_error = str(e)
+                raise
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._lock:
+                self.flushes += 1
+                self.flushed_rows += len(rows) - dropped
+                self.dropped_rows += dropped
+                self.last_flush_ms = round(elapsed_ms, 3)
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self.total_flush_ms += elapsed_ms
+            return len(rows) - dropped
+
+    def _insert_rows(self, db, rows):
+        """
+        Inserta los checkpoints en la transacción de `db`. Si el lote falla por algo que no es
+        la base de datos (p.ej. un número que no cabe en SQLite), los inserta de uno en uno y
+        descarta los que fallan. Devuelve cuántos se han descartado.
+        """
+        try:
+            db.executemany(INSERT_CHECKPOINT_QUERY, rows)
+            return 0
+        except sqlite3.OperationalError:
+            raise
+        except Exception as e:
+            print(f"Error al guardar {len(rows)} checkpoints de escucha juntos, se guardan de uno en uno: {e}")
+            # executemany deja en la transacción las filas anteriores a la que ha fallado
+            db.rollback()
+
+        dropped = 0
+        for row in rows:
+            try:
+                db.execute(INSERT_CHECKPOINT_QUERY, row)
+            except sqlite3.OperationalError:
+                raise
+            except Exception as e:
+                print(f"Checkpoint de escucha descartado (song_id={row[0]!r}, ms_played={row[1]!r}): {e}")
+                with self._lock:
+                    self.last_error = str(e)
+                dropped += 1
+        return dropped
+
+    def _flush_at_exit(self):
+        try:
+            flushed = self.flush()
+            if flushed:
+                print(f"Checkpoints de escucha guardados al cerrar: {flushed}")
+        except Exception as e:
+            print(f"No se pudieron guardar los checkpoints de escucha al cerrar: {e}")
+
+    def _run(self):
+        """Hilo que guarda los pendientes al llegar a flush_size o cada flush_interval segundos."""
+        while True:
+            with self._lock:
+                if len(self._rows) < self.flush_size:
+                    self._wakeup.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error al guardar los checkpoints de escucha: {e}")
+
+    def stats(self):
+        """Contadores para poder ajustar los umbrales del buffer."""
+        with self._lock:
+            return {
+                'pending': len(self._rows),
+                'max_pending': self.max_pending,
+                'flush_size': self.flush_size,
+                'flush_interval': self.flush_interval,
+                'flushes': self.flushes,
+                'flushed_rows': self.flushed_rows,
+                'failed_flushes': self.failed_flushes,
+                'dropped_rows': self.dropped_rows,
+                'last_flush_ms': self.last_flush_ms,
+                'avg_flush_ms': round(self.total_flush_ms / self.flushes, 3) if self.flushes else None,
+                'max_flush_ms': round(self.max_flush_ms, 3),
+                'last_error': self.last_error,
+            }
+
+
+# Instancia única compartida por los endpoints
+checkpoint_buffer = CheckpointBuffer()
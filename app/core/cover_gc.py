@@ -0,0 +1,99 @@
+# app/core/cover_gc.py
+import json
+import threading
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.core.db import get_db
+from app.core.files import delete_cover_files
+
+# Limpieza de portadas que ya no usa nadie.
+# Los triggers de la migración 0008 mantienen `cover.ref_count` (canciones + playlists que
+# usan cada portada), así que los endpoints ya no cuentan nada al borrar o cambiar una
+# portada: la que se queda a 0 la borra más tarde este barrido, por lotes.
+#
+# Solo se borran las que llevan al menos COVER_GC_GRACE segundos sin usarse: una portada
+# recién creada o recién liberada puede estar a punto de usarse en otra petición (p.ej.
+# una importación que la encontró por su hash y todavía no ha guardado la canción).
+
+# Portadas que se borran en cada transacción
+COVER_GC_BATCH_SIZE = 500
+
+
+def sweep_covers(db, grace_seconds=None, batch_size=COVER_GC_BATCH_SIZE):
+    """
+    Borra las filas y los archivos de las portadas sin referencias desde hace más de
+    `grace_seconds` (COVER_GC_GRACE por defecto). Devuelve cuántas se han borrado.
+    """
+    if grace_seconds is None:
+        grace_seconds = current_app.config['COVER_GC_GRACE']
+    deleted = 0
+    while True:
+        # Buscar y borrar en la misma transacción de escritura. Quien reutiliza una portada también
+        # la busca con el lock de escritura cogido (get_or_create_cover e import_files), así que
+        # o confirma antes (y ref_count ya no es 0) o espera a que acabemos y ya no la encuentra
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            covers = db.execute(
+                "SELECT * FROM cover WHERE ref_count = 0 AND released_at <= datetime('now', ?) LIMIT ?",
+                (f'-{int(grace_seconds)} seconds', batch_size)
+            ).fetchall()
+            if covers:
+                db.execute(
+                    "DELETE FROM cover WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps([cover['id'] for cover in covers]),)
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        # Los archivos, ya fuera de la transacción (si falla alguno solo queda un archivo suelto).
+        # Los ids de portada no se reutilizan (ver get_next_id), así que una portada creada
+        # mientras tanto nunca tiene el mismo nombre de archivo que estas
+        for cover in covers:
+            try:
+                delete_cover_files(cover)
+            except OSError as e:
+                print(f"No se pudieron borrar los archivos de la portada {cover['id']}: {e}")
+        deleted += len(covers)
+        if len(covers) < batch_size:
+            return deleted
+
+
+def run_cover_gc(app, interval):
+    """Bucle del barrido: busca portadas sin usar cada `interval` segundos (no termina nunca)."""
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                deleted = sweep_covers(get_db())
+                if deleted:
+                    print(f"Portadas sin usar borradas: {deleted}")
+            except Exception as e:
+                print(f"Error al limpiar las portadas: {e}")
+
+
+def start_cover_gc(app):
+    """Arranca el barrido de portadas en un hilo aparte. Devuelve el hilo."""
+    gc_thread = threading.Thread(
+        target=run_cover_gc,
+        args=(app, app.config['COVER_GC_INTERVAL']),
+        daemon=True
+    )
+    gc_thread.start()
+    return gc_thread
+
+
+@click.command('gc-covers')
+@click.option('--grace', type=int, default=None, help='Only delete covers unused for at least this many seconds.')
+@with_appcontext
+def gc_covers_command(grace):
+    """Delete covers that no song or playlist uses anymore."""
+    deleted = sweep_covers(get_db(), grace)
+    click.echo(f"Portadas borradas: {deleted}")
+
+
+def init_app(app):
+    app.cli.add_command(gc_covers_command)
@@ -0,0 +1,196 @@
+# app/core/covers.py
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from PIL import Image
+from app.core.files import COVER_VARIANTS, COVER_COLUMNS, delete_cover_files, hash_bytes, save_cover_variants
+from app.core.metadata import read_tags
+from app.core.song_cache import song_cache
+from app.core.typeahead import typeahead_index
+from app.core.versions import bump_version
+
+# Procesado de portadas (subidas, edición de canciones y playlists, importación y escaneo).
+# Todas pasan por `process_cover_variants`, que:
+# - Lee solo la cabecera antes de decodificar y rechaza las imágenes con demasiados píxeles
+#   (una "bomba de descompresión" de pocos KB puede ocupar varios GB una vez decodificada).
+# - En los JPEG pide a Pillow que decodifique ya reducida (draft): una portada de 3000x3000
+#   se decodifica directamente a 750x750 (1/4), sin pasar por la imagen completa en memoria.
+# - Limita cuántas portadas se decodifican a la vez en todo el proceso (COVER_WORKERS),
+#   aunque lleguen a la vez peticiones, trabajos de importación y el escaneo de la biblioteca.
+# Las portadas guardadas antes de la migración 0004 no tienen hashes, y las de antes de la 0007
+# solo tienen la variante grande: `flask migrate-db` los rellena con `backfill_cover_hashes`
+# (para que las importaciones también las reutilicen) y `backfill_cover_variants`.
+
+# Lado máximo de la variante más grande (ver COVER_VARIANTS)
+COVER_MAX_SIZE = max(max_size for max_size, _, _, _ in COVER_VARIANTS.values())
+
+# Píxeles máximos de la imagen original (40 MP: una foto de móvil pasa, una bomba no)
+MAX_COVER_PIXELS = 40_000_000
+
+# Portadas que se pueden estar decodificando a la vez (cada una ocupa memoria mientras tanto)
+COVER_WORKERS = min(4, os.cpu_count() or 1)
+
+_decode_slots = threading.BoundedSemaphore(COVER_WORKERS)
+
+# Las variantes de mayor a menor: cada una se reduce a partir de la anterior
+_VARIANTS_BY_SIZE = sorted(COVER_VARIANTS.items(), key=lambda item: -item[1][0])
+
+
+def open_cover(image_data, max_size=COVER_MAX_SIZE):
+    """
+    Abre una imagen de portada ya reducida a `max_size` px como máximo y en RGB.
+    Lanza ValueError si la imagen original tiene más de MAX_COVER_PIXELS píxeles.
+    """
+    img = Image.open(io.BytesIO(image_data))  # Solo lee la cabecera
+    width, height = img.size
+    if width * height > MAX_COVER_PIXELS:
+        raise ValueError(f"Cover image too large ({width}x{height})")
+
+    # Solo hace algo en JPEG: decodifica a 1/2, 1/4 o 1/8 sin bajar de max_size
+    img.draft('RGB', (max_size, max_size))
+    img.thumbnail((max_size, max_size))
+    return img.convert('RGB')
+
+
+def process_cover_variants(image_data):
+    """
+    Genera todas las variantes de una portada (ver COVER_VARIANTS): 500, 300 y 96 px como
+    máximo, en JPEG (calidad 85) y WebP (calidad 80). Devuelve {columna de `cover`: bytes}.
+    La imagen se decodifica una vez y se va reduciendo de la más grande a la más pequeña.
+    """
+    with _decode_slots:
+        img = open_cover(image_data)
+
+        variants = {}
+        for column, (max_size, image_format, _, _) in _VARIANTS_BY_SIZE:
+            img.thumbnail((max_size, max_size))
+            output_buffer = io.BytesIO()
+            img.save(output_buffer, format=image_format, quality=85 if image_format == 'JPEG' else 80)
+            variants[column] = output_buffer.getvalue()
+        return variants
+
+
+def process_covers(images, workers=None):
+    """
+    Procesa varias portadas en paralelo, con `workers` hilos como máximo (COVER_WORKERS por defecto).
+    Recibe {clave: bytes de la imagen} y devuelve {clave: (variantes, None) o (None, excepción)}.
+    """
+    def safe_process(image_data):
+        try:
+            return process_cover_variants(image_data), None
+        except Exception as e:
+            return None, e
+
+    workers = min(workers or COVER_WORKERS, len(images))
+    if workers <= 1:
+        return {key: safe_process(image_data) for key, image_data in images.items()}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(images, pool.map(safe_process, images.values())))
+
+
+def _legacy_cover_jpeg(image_data):
+    """La portada tal y como se guardaba antes de la migración 0004 (500 px, JPEG calidad 85)."""
+    with _decode_slots:
+        img = Image.open(io.BytesIO(image_data))
+        width, height = img.size
+        if width * height > MAX_COVER_PIXELS:
+            raise ValueError(f"Cover image too large ({width}x{height})")
+        img.thumbnail((500, 500))
+        output_buffer = io.BytesIO()
+        img.convert('RGB').save(output_buffer, format='JPEG', quality=85)
+        return output_buffer.getvalue()
+
+
+def _find_cover_source(db, cover_id, image_data):
+    """
+    Busca entre las canciones que usan la portada la imagen original de la que salió: la que,
+    procesada como entonces o como ahora, da exactamente el mismo JPEG. Devuelve su hash o None
+    (p.ej. si la portada se subió a mano y no viene de ningún MP3).
+    """
+    media_folder = current_app.config['MEDIA_FOLDER']
+    songs = db.execute("SELECT file_basename FROM song WHERE cover_id = ? LIMIT 5", (cover_id,)).fetchall()
+    for song in songs:
+        source_data = read_tags(os.path.join(media_folder, song['file_basename']))['cover_data']
+        if not source_data:
+            continue
+        try:
+            if image_data in (_legacy_cover_jpeg(source_data), process_cover_variants(source_data)['path']):
+                return hash_bytes(source_data)
+        except Exception as e:
+            print(f"No se pudo procesar la imagen original de la portada {cover_id}: {e}")
+    return None
+
+
+def backfill_cover_hashes(db):
+    """
+    Rellena source_sha256 e image_sha256 de las portadas anteriores a la migración 0004:
+    - image_sha256: el hash del JPEG guardado (`path`).
+    - source_sha256: el de la imagen del MP3 de una canción que la usa, solo si se comprueba
+      que la portada salió de ella (ver `_find_cover_source`).
+    Cada portada se mira una sola vez: las que ya tienen image_sha256 se saltan aunque no se
+    haya encontrado su original. Devuelve cuántas portadas se han actualizado.
+    """
+    covers = db.execute("SELECT id, path, source_sha256 FROM cover WHERE image_sha256 IS NULL").fetchall()
+    updated = 0
+    for cover in covers:
+        try:
+            with open(os.path.join(current_app.root_path, cover['path']), 'rb') as f:
+                image_data = f.read()
+        except OSError as e:
+            print(f"No se pudo leer la portada {cover['id']}: {e}")
+            continue
+        source_sha256 = cover['source_sha256'] or _find_cover_source(db, cover['id'], image_data)
+        db.execute(
+            "UPDATE cover SET image_sha256 = ?, source_sha256 = ? WHERE id = ?",
+            (hash_bytes(image_data), source_sha256, cover['id'])
+        )
+        db.commit()
+        updated += 1
+    return updated
+
+
+def backfill_cover_variants(db):
+    """
+    Genera las variantes que faltan (portadas anteriores a la migración 0007) a partir de la
+    grande (`path`), que no se toca. Devuelve cuántas portadas se han completado.
+    """
+    missing = ' OR '.join(f"{column} IS NULL" for column in COVER_COLUMNS if column != 'path')
+    covers = db.execute(f"SELECT * FROM cover WHERE {missing}").fetchall()
+    updated = 0
+    for cover in covers:
+        try:
+            with open(os.path.join(current_app.root_path, cover['path']), 'rb') as f:
+                variants = process_cover_variants(f.read())
+        except Exception as e:
+            print(f"No se pudieron generar las variantes de la portada {cover['id']}: {e}")
+            continue
+        variants = {column: data for column, data in variants.items() if column != 'path' and not cover[column]}
+
+        # Con el lock de escritura: el barrido de portadas no puede borrarla mientras tanto
+        db.execute("BEGIN IMMEDIATE")
+        paths = {}
+        try:
+            if db.execute("SELECT 1 FROM cover WHERE id = ?", (cover['id'],)).fetchone() is None:
+                db.rollback()
+                continue
+            paths = save_cover_variants(variants, cover['id'])
+            db.execute(
+                f"UPDATE cover SET {', '.join(f'{column} = ?' for column in paths)} WHERE id = ?",
+                tuple(paths.values()) + (cover['id'],)
+            )
+            bump_version(db, 'library')
+            db.commit()
+        except Exception:
+            db.rollback()
+            delete_cover_files(paths)
+            raise
+        updated += 1
+
+    if updated:
+        # Las canciones en memoria tienen las rutas de antes (los demás procesos lo ven por la versión)
+        song_cache.clear()
+        typeahead_index.load(db)
+    return updated
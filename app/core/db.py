@@ -1,73 +1,170 @@
-# app/core/db.py
-import sqlite3
-import click
-from flask import current_app, g # current_app es la app Flask, g es un objeto global para la petición
-
-def get_db():
-    # Si la conexión a la base de datos no existe en el objeto 'g' de la petición, la crea
-    if 'db' not in g:
-        # current_app.config['DATABASE'] contiene la ruta a nuestra base de datos SQLite
-        g.db = sqlite3.connect(
-            current_app.config['DATABASE'],
-            detect_types=sqlite3.PARSE_DECLTYPES # Ayuda a convertir tipos como DATETIME
-        )
-        g.db.row_factory = sqlite3.Row # Permite acceder a las columnas por nombre (como un diccionario)
-
-    return g.db
-
-def close_db(e=None):
-    # Cierra la conexión a la base de datos si existe
-    db = g.pop('db', None)
-
-    if db is not None:
-        db.close()
-
-def init_db():
-    # Obtiene una conexión a la base de datos
-    db = get_db()
-
-    # Lee el archivo 'schema.sql' y ejecuta las instrucciones SQL para crear las tablas
-    with current_app.open_resource('core/schema.sql') as f:
-        db.executescript(f.read().decode('utf8'))
-
-# Define un comando de línea de comandos para inicializar la base de datos
-@click.command('init-db')
-def init_db_command():
-    """Clear the existing data and create new tables."""
-    init_db()
-    click.echo('Initialized the database.')
-
-def init_app(app):
-    # Registra la función 'close_db' para que se ejecute después de cada petición
-    app.teardown_appcontext(close_db)
-    # Registra el comando 'init-db' para que pueda ser llamado desde la CLI
-    app.cli.add_command(init_db_command)
-
-def get_all_settings():
-    """
-    Lee todos los ajustes de la tabla 'setting' y los devuelve
-    como un diccionario Python.
-    """
-    try:
-        db = get_db()
-        settings_from_db = db.execute("SELECT key, value FROM setting").fetchall()
-        
-        # Convierte la lista de filas de la base de datos en un diccionario simple
-        settings_dict = {row['key']: row['value'] for row in settings_from_db}
-        
-        # El HTML y JavaScript envían los checkboxes como 'true' o 'false' en texto.
-        # Aquí los convertimos a verdaderos valores Booleanos (True/False) de Python
-        # para que nuestros condicionales (if) funcionen correctamente.
-        for key, value in settings_dict.items():
-            if isinstance(value, str):
-                if value.lower() == 'true':
-                    settings_dict[key] = True
-                elif value.lower() == 'false':
-                    settings_dict[key] = False
-
-        return settings_dict
-    except Exception as e:
-        # Si hay cualquier error (ej: la base de datos no está lista),
-        # devolvemos un diccionario vacío para que la app no falle.
-        print(f"Error al leer los ajustes de la base de datos: {e}")
+# app/core/db.py
+import os
+import re
+import sqlite3
+import click
+from flask import current_app, g # current_app es la app Flask, g es un objeto global para la petición
+from app.core.song_cache import song_cache
+from app.core.versions import reset_versions
+from app.core.typeahead import typeahead_index
+
+# Las migraciones son archivos 'NNNN_descripcion.sql' dentro de app/core/migrations
+MIGRATION_FILE_RE = re.compile(r'^(\d+)_.*\.sql$')
+
+def get_db():
+    # Si la conexión a la base de datos no existe en el objeto 'g' de la petición, la crea
+    if 'db' not in g:
+        # current_app.config['DATABASE'] contiene la ruta a nuestra base de datos SQLite
+        g.db = sqlite3.connect(
+            current_app.config['DATABASE'],
+            detect_types=sqlite3.PARSE_DECLTYPES # Ayuda a convertir tipos como DATETIME
+        )
+        g.db.row_factory = sqlite3.Row # Permite acceder a las columnas por nombre (como un diccionario)
+
+    return g.db
+
+def close_db(e=None):
+    # Cierra la conexión a la base de datos si existe
+    db = g.pop('db', None)
+
+    if db is not None:
+        db.close()
+
+def init_db():
+    # Obtiene una conexión a la base de datos
+    db = get_db()
+
+    # Lee el archivo 'schema.sql' y ejecuta las instrucciones SQL para crear las tablas
+    with current_app.open_resource('core/schema.sql') as f:
+        db.executescript(f.read().decode('utf8'))
+
+    # schema.sql deja el esquema en la versión 0; las migraciones lo ponen al día
+    migrate_db()
+
+    # Las canciones que hubiera en la caché (y las versiones que conocía el navegador) ya no valen
+    song_cache.clear()
+    typeahead_index.clear()
+    reset_versions(db)
+
+def get_migrations():
+    """
+    Devuelve la lista ordenada de migraciones disponibles como (versión, nombre_de_archivo).
+    """
+    migrations_folder = os.path.join(current_app.root_path, 'core', 'migrations')
+    migrations = []
+    for filename in os.listdir(migrations_folder):
+        match = MIGRATION_FILE_RE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), filename))
+    migrations.sort()
+    return migrations
+
+def migrate_db():
+    """
+    Aplica, en orden, las migraciones cuyo número es mayor que `PRAGMA user_version`.
+    Cada migración va en su propia transacción junto con el cambio de versión:
+    si falla, la base de datos se queda exactamente en la versión anterior.
+    Devuelve la lista de archivos aplicados.
+    """
+    db = get_db()
+    current_version = db.execute("PRAGMA user_version").fetchone()[0]
+    applied = []
+
+    for version, filename in get_migrations():
+        if version <= current_version:
+            continue
+
+        with current_app.open_resource(f'core/migrations/{filename}') as f:
+            script = f.read().decode('utf8')
+
+        try:
+            db.executescript(
+                f"BEGIN IMMEDIATE;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            if db.in_transaction:
+                db.rollback()
+            print(f"Error al aplicar la migración {filename}")
+            raise
+
+        current_version = version
+        applied.append(filename)
+
+    return applied
+
+# Define un comando de línea de comandos para inicializar la base de datos
+@click.command('init-db')
+def init_db_command():
+    """Clear the existing data and create new tables."""
+    init_db()
+    click.echo('Initialized the database.')
+
+# Comando para aplicar las migraciones pendientes sin borrar nada
+@click.command('migrate-db')
+def migrate_db_command():
+    """Apply pending schema migrations and fill in what they cannot compute, keeping existing data."""
+    applied = migrate_db()
+    if applied:
+        for filename in applied:
+            click.echo(f'Applied {filename}')
+    else:
+        click.echo('The database is already up to date.')
+
+    # Datos que las migraciones no pueden calcular con SQL (hay que leer archivos).
+    # Importado aquí: covers depende de Pillow y de files, que no hacen falta para lo demás
+    from app.core.covers import backfill_cover_hashes, backfill_cover_variants
+    updated = backfill_cover_hashes(get_db())
+    if updated:
+        click.echo(f'Cover hashes filled in: {updated}')
+    updated = backfill_cover_variants(get_db())
+    if updated:
+        click.echo(f'Cover sizes generated: {updated}')
+
+def init_app(app):
+    # Registra la función 'close_db' para que se ejecute después de cada petición
+    app.teardown_appcontext(close_db)
+    # Registra el comando 'init-db' para que pueda ser llamado desde la CLI
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(migrate_db_command)
+
+    # Al arrancar, pone al día el esquema de las bases de datos ya inicializadas
+    # (si todavía no hay tablas, es `flask init-db` quien las crea y migra)
+    with app.app_context():
+        try:
+            db = get_db()
+            has_songs = db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'song'"
+            ).fetchone()
+            if has_songs:
+                migrate_db()
+        except sqlite3.Error as e:
+            print(f"Error al migrar la base de datos: {e}")
+
+def get_all_settings():
+    """
+    Lee todos los ajustes de la tabla 'setting' y los devuelve
+    como un diccionario Python.
+    """
+    try:
+        db = get_db()
+        settings_from_db = db.execute("SELECT key, value FROM setting").fetchall()
+        
+        # Convierte la lista de filas de la base de datos en un diccionario simple
+        settings_dict = {row['key']: row['value'] for row in settings_from_db}
+        
+        # El HTML y JavaScript envían los checkboxes como 'true' o 'false' en texto.
+        # Aquí los convertimos a verdaderos valores Booleanos (True/False) de Python
+        # para que nuestros condicionales (if) funcionen correctamente.
+        for key, value in settings_dict.items():
+            if isinstance(value, str):
+                if value.lower() == 'true':
+                    settings_dict[key] = True
+                elif value.lower() == 'false':
+                    settings_dict[key] = False
+
+        return settings_dict
+    except Exception as e:
+        # Si hay cualquier error (ej: la base de datos no está lista),
+        # devolvemos un diccionario vacío para que la app no falle.
+        print(f"Error al leer los ajustes de la base de datos: {e}")
         return {}
\ No newline at end of file
@@ -1,81 +1,407 @@
-# app/core/files.py
-import os
-import shutil
-from flask import current_app
-
-def get_next_id(db, table_name):
-    """
-    Obtiene el próximo ID disponible para una tabla, basado en el máximo actual + 1.
-    """
-    cursor = db.execute(f"SELECT MAX(id) FROM {table_name}")
-    max_id = cursor.fetchone()[0]
-    return (max_id if max_id else 0) + 1
-
-def format_id_for_filename(item_id, length=4):
-    """
-    Formatea un ID numérico a una cadena con ceros a la izquierda (ej: 1 -> "0001").
-    """
-    return str(item_id).zfill(length)
-
-def save_song_file(file_stream, song_id):
-    """
-    Guarda un archivo de canción (MP3) en la carpeta 'media' con un nombre basado en su ID.
-    Retorna el nombre del archivo guardado (ej: '0001.mp3').
-    """
-    media_folder = current_app.config['MEDIA_FOLDER']
-    # Asegúrate de que la carpeta existe
-    os.makedirs(media_folder, exist_ok=True)
-
-    filename = f"{format_id_for_filename(song_id)}.mp3"
-    filepath = os.path.join(media_folder, filename)
-
-    # Guarda el archivo
-    with open(filepath, 'wb') as f:
-        # chunk_size es para manejar archivos grandes sin cargar todo en memoria
-        while True:
-            chunk = file_stream.read(8192) # Lee 8KB a la vez
-            if not chunk:
-                break
-            f.write(chunk)
-    
-    return filename
-
-def delete_song_file(file_basename):
-    """
-    Elimina un archivo de canción de la carpeta 'media'.
-    """
-    media_folder = current_app.config['MEDIA_FOLDER']
-    filepath = os.path.join(media_folder, file_basename)
-    if os.path.exists(filepath):
-        os.remove(filepath)
-        return True
-    return False
-
-def save_cover_image(image_data, cover_id, file_extension): # Cambiado 'file_stream' a 'image_data'
-    """
-    Guarda una imagen de portada en la carpeta 'static/covers' con un nombre basado en su ID.
-    Recibe los datos binarios de la imagen (image_data) directamente.
-    Retorna el nombre del archivo guardado (ej: 'P0001.png').
-    """
-    covers_folder = current_app.config['COVERS_FOLDER']
-    os.makedirs(covers_folder, exist_ok=True) # Asegúrate de que la carpeta existe
-
-    filename = f"P{format_id_for_filename(cover_id)}.{file_extension}"
-    filepath = os.path.join(covers_folder, filename)
-
-    with open(filepath, 'wb') as f:
-        f.write(image_data) # <--- ¡Cambiado para escribir los bytes directamente!
-    
-    return filename
-
-def delete_cover_image(cover_path):
-    """
-    Elimina un archivo de portada del sistema.
-    cover_path es la ruta relativa guardada en la DB (ej: 'static/covers/P0001.png').
-    """
-    # app.root_path es la ruta absoluta a la carpeta 'app/'
-    full_path = os.path.join(current_app.root_path, cover_path)
-    if os.path.exists(full_path):
-        os.remove(full_path)
-        return True
-    return False
+# app/core/files.py
+import os
+import shutil
+import hashlib
+import json
+import tempfile
+from flask import current_app, Request, g
+
+# Subcarpeta de 'media' donde se escriben las subidas mientras llegan. Al estar dentro
+# de 'media', el paso final a su nombre definitivo es un simple rename (atómico y sin copiar).
+STAGING_DIRNAME = '.staging'
+
+def get_next_id(db, table_name):
+    """
+    Obtiene el próximo ID disponible para una tabla, basado en el máximo + 1.
+    En las tablas AUTOINCREMENT el máximo incluye los ids de filas ya borradas (sqlite_sequence):
+    un id no se repite nunca, así que los archivos de una portada borrada (P0042.jpeg...) no se
+    confunden con los de una nueva mientras el barrido de app/core/cover_gc.py los elimina.
+    """
+    cursor = db.execute(
+        f"SELECT MAX(IFNULL((SELECT seq FROM sqlite_sequence WHERE name = ?), 0), IFNULL(MAX(id), 0)) FROM {table_name}",
+        (table_name,)
+    )
+    return cursor.fetchone()[0] + 1
+
+def reserve_ids(db, table_name, count):
+    """
+    Reserva `count` ids consecutivos para insertar muchas filas de golpe (con executemany)
+    en vez de llamar a `get_next_id` antes de cada INSERT.
+    Hay que llamarla dentro de una transacción de escritura (BEGIN IMMEDIATE): así ninguna
+    otra importación puede leer el mismo MAX(id) hasta que hagamos commit.
+    """
+    if count <= 0:
+        return []
+    first_id = get_next_id(db, table_name)
+    return list(range(first_id, first_id + count))
+
+def format_id_for_filename(item_id, length=4):
+    """
+    Formatea un ID numérico a una cadena con ceros a la izquierda (ej: 1 -> "0001").
+    """
+    return str(item_id).zfill(length)
+
+def get_staging_folder():
+    """
+    Devuelve (y crea si hace falta) la carpeta de staging dentro de 'media'.
+    """
+    staging_folder = os.path.join(current_app.config['MEDIA_FOLDER'], STAGING_DIRNAME)
+    os.makedirs(staging_folder, exist_ok=True)
+    return staging_folder
+
+class StagingFile:
+    """
+    Archivo temporal en la carpeta de staging que calcula el SHA-256 mientras se escribe.
+    Así cada byte subido se escribe una sola vez: aquí, y después solo se renombra.
+    Se comporta como un archivo normal (write/seek/read/close) para que Werkzeug pueda
+    volcar en él directamente la parte del formulario.
+    """
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(suffix='.part', dir=get_staging_folder())
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self._hash.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        """SHA-256 de todo lo escrito hasta ahora."""
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        # Todo lo demás (seek, read, flush, close...) va directo al archivo real
+        return getattr(self._file, name)
+
+def commit_staged_file(staging_path, final_filename):
+    """
+    Mueve un archivo de staging a la carpeta 'media' con su nombre definitivo.
+    Es un rename dentro del mismo sistema de archivos: atómico y sin copiar datos.
+    Retorna la ruta final.
+    """
+    final_path = os.path.join(current_app.config['MEDIA_FOLDER'], final_filename)
+    os.replace(staging_path, final_path)
+    return final_path
+
+def replace_media_file(staging_path, final_filename):
+    """
+    Como `commit_staged_file`, pero si ya había un archivo con ese nombre lo aparta a la carpeta
+    de staging (con '.bak') en vez de perderlo, por si la transacción que lo usa falla.
+    Retorna (ruta_final, ruta_de_la_copia o None). Ver `restore_media_file` y `discard_staged_file`.
+    """
+    final_path = os.path.join(current_app.config['MEDIA_FOLDER'], final_filename)
+    backup_path = None
+    if os.path.exists(final_path):
+        fd, backup_path = tempfile.mkstemp(suffix='.bak', dir=get_staging_folder())
+        os.close(fd)
+        os.replace(final_path, backup_path)
+    try:
+        os.replace(staging_path, final_path)
+    except OSError:
+        restore_media_file(final_path, backup_path)
+        raise
+    return final_path, backup_path
+
+def restore_media_file(final_path, backup_path):
+    """
+    Deshace `replace_media_file`: vuelve a poner el archivo que había (o borra el nuevo si no había).
+    """
+    if backup_path:
+        os.replace(backup_path, final_path)
+    elif os.path.exists(final_path):
+        os.remove(final_path)
+
+def stage_file(source_path):
+    """
+    Copia un archivo cualquiera (p.ej. de una carpeta de red) a la carpeta de staging,
+    calculando su SHA-256 por el camino. Retorna (ruta_en_staging, sha256).
+    """
+    staging_file = StagingFile()
+    try:
+        with open(source_path, 'rb') as source:
+            shutil.copyfileobj(source, staging_file, 1024 * 1024)
+        staging_file.close()
+    except Exception:
+        staging_file.close()
+        discard_staged_file(staging_file.path)
+        raise
+    return staging_file.path, staging_file.hexdigest()
+
+def discard_staged_file(staging_path):
+    """
+    Borra un archivo de staging que no se llegó a usar.
+    """
+    if staging_path and os.path.exists(staging_path):
+        os.remove(staging_path)
+
+class StagingRequest(Request):
+    """
+    Petición de Flask que vuelca los MP3 de la importación directamente en la carpeta de staging.
+    Por defecto Werkzeug los guardaría primero en su propio temporal (en otro disco, quizá),
+    y luego habría que copiarlos otra vez a 'media'.
+    """
+
+    # Endpoints cuyas subidas MP3 van directas a staging
+    staging_endpoints = {'songs.upload_songs'}
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint in self.staging_endpoints and filename and filename.lower().endswith('.mp3'):
+            staging_file = StagingFile()
+            # Los apuntamos para borrarlos al final de la petición si nadie los ha usado
+            g.setdefault('staging_paths', []).append(staging_file.path)
+            return staging_file
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+def release_request_staging_files(staging_paths):
+    """
+    La petición deja de ser dueña de esos archivos de staging (p.ej. se los ha quedado un
+    trabajo de importación en segundo plano), así que no se borran al terminar la petición.
+    """
+    released = set(staging_paths)
+    g.staging_paths = [path for path in g.get('staging_paths', []) if path not in released]
+
+def discard_request_staging_files(e=None):
+    """
+    Al terminar la petición, borra los archivos de staging que no se hayan movido a 'media'.
+    """
+    for staging_path in g.pop('staging_paths', []):
+        discard_staged_file(staging_path)
+
+def save_song_file(file_stream, song_id):
+    """
+    Guarda un archivo de canción (MP3) en la carpeta 'media' con un nombre basado en su ID.
+    Se escribe primero en staging (calculando su SHA-256) y después se renombra, así nunca
+    queda a medias un '0001.mp3'.
+    Retorna (nombre_del_archivo, sha256) (ej: ('0001.mp3', 'ab12...')).
+    """
+    staging_file = StagingFile()
+    try:
+        # chunk_size es para manejar archivos grandes sin cargar todo en memoria
+        while True:
+            chunk = file_stream.read(64 * 1024) # Lee 64KB a la vez
+            if not chunk:
+                break
+            staging_file.write(chunk)
+        staging_file.close()
+
+        filename = f"{format_id_for_filename(song_id)}.mp3"
+        commit_staged_file(staging_file.path, filename)
+        return filename, staging_file.hexdigest()
+    finally:
+        discard_staged_file(staging_file.path)
+
+def delete_song_file(file_basename):
+    """
+    Elimina un archivo de canción de la carpeta 'media'.
+    """
+    media_folder = current_app.config['MEDIA_FOLDER']
+    filepath = os.path.join(media_folder, file_basename)
+    if os.path.exists(filepath):
+        os.remove(filepath)
+        return True
+    return False
+
+# Variantes que se guardan de cada portada: columna de la tabla `cover` -> (lado máximo en px,
+# formato de Pillow, extensión, sufijo del nombre). `path` es la portada de siempre (P0001.jpeg).
+COVER_VARIANTS = {
+    'path': (500, 'JPEG', 'jpeg', ''),
+    'path_medium': (300, 'JPEG', 'jpeg', '_m'),
+    'path_small': (96, 'JPEG', 'jpeg', '_s'),
+    'webp_large': (500, 'WEBP', 'webp', ''),
+    'webp_medium': (300, 'WEBP', 'webp', '_m'),
+    'webp_small': (96, 'WEBP', 'webp', '_s'),
+}
+COVER_COLUMNS = tuple(COVER_VARIANTS)
+
+def save_cover_image(image_data, cover_id, file_extension, suffix=''): # Cambiado 'file_stream' a 'image_data'
+    """
+    Guarda una imagen de portada en la carpeta 'static/covers' con un nombre basado en su ID.
+    Recibe los datos binarios de la imagen (image_data) directamente.
+    `suffix` distingue los tamaños de una misma portada (ej: '_s' -> 'P0001_s.jpeg').
+    Retorna el nombre del archivo guardado (ej: 'P0001.png').
+    """
+    covers_folder = current_app.config['COVERS_FOLDER']
+    os.makedirs(covers_folder, exist_ok=True) # Asegúrate de que la carpeta existe
+
+    filename = f"P{format_id_for_filename(cover_id)}{suffix}.{file_extension}"
+    filepath = os.path.join(covers_folder, filename)
+
+    with open(filepath, 'wb') as f:
+        f.write(image_data) # <--- ¡Cambiado para escribir los bytes directamente!
+    
+    return filename
+
+def save_cover_variants(variants, cover_id):
+    """
+    Guarda todas las variantes de una portada ({columna: bytes}, ver COVER_VARIANTS).
+    Retorna {columna: ruta relativa para la DB}. Si falla alguna, borra las ya escritas.
+    """
+    paths = {}
+    try:
+        for column, image_data in variants.items():
+            _, _, file_extension, suffix = COVER_VARIANTS[column]
+            cover_filename = save_cover_image(image_data, cover_id, file_extension, suffix)
+            paths[column] = os.path.join('static', 'covers', cover_filename)
+    except Exception:
+        delete_cover_files(paths)
+        raise
+    return paths
+
+def delete_cover_image(cover_path):
+    """
+    Elimina un archivo de portada del sistema.
+    cover_path es la ruta relativa guardada en la DB (ej: 'static/covers/P0001.png').
+    """
+    # app.root_path es la ruta absoluta a la carpeta 'app/'
+    full_path = os.path.join(current_app.root_path, cover_path)
+    if os.path.exists(full_path):
+        os.remove(full_path)
+        return True
+    return False
+
+def delete_cover_files(cover):
+    """
+    Elimina todos los archivos (todas las variantes) de una portada.
+    `cover` es la fila de la tabla `cover` o un dict {columna: ruta}.
+    """
+    keys = cover.keys()
+    for column in COVER_COLUMNS:
+        if column in keys and cover[column]:
+            delete_cover_image(cover[column])
+
+def hash_bytes(data):
+    """
+    Devuelve el SHA-256 (en hexadecimal) de unos datos binarios.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def find_cover(db, source_sha256=None, image_sha256=None):
+    """
+    Busca una portada ya guardada por el hash de la imagen original (tal cual venía en el
+    MP3 o en la subida) o por el hash del JPEG ya procesado. Retorna la fila o None.
+    """
+    if source_sha256:
+        cover = db.execute("SELECT id, path FROM cover WHERE source_sha256 = ? LIMIT 1", (source_sha256,)).fetchone()
+        if cover:
+            return cover
+    if image_sha256:
+        return db.execute("SELECT id, path FROM cover WHERE image_sha256 = ? LIMIT 1", (image_sha256,)).fetchone()
+    return None
+
+def _insert_covers(db, rows):
+    """Inserta portadas nuevas: rows = [(cover_id, {columna: ruta}, source_sha256, image_sha256), ...]."""
+    columns = ', '.join(COVER_COLUMNS)
+    placeholders = ', '.join('?' for _ in COVER_COLUMNS)
+    db.executemany(
+        f"INSERT INTO cover (id, code, {columns}, source_sha256, image_sha256) VALUES (?, ?, {placeholders}, ?, ?)",
+        [
+            (cover_id, f"P{format_id_for_filename(cover_id)}")
+            + tuple(paths.get(column) for column in COVER_COLUMNS)
+            + (source_sha256, image_sha256)
+            for cover_id, paths, source_sha256, image_sha256 in rows
+        ]
+    )
+
+def get_or_create_cover(db, source_sha256, process):
+    """
+    Devuelve el id de la portada para una imagen, reutilizando la que ya exista si es idéntica.
+    - source_sha256: hash de la imagen original.
+    - process: función sin argumentos que devuelve las variantes ya procesadas ({columna: bytes},
+      ver COVER_VARIANTS) o None. Solo se llama si la imagen original no está ya guardada,
+      así que las repetidas no pasan por Pillow.
+    Retorna (cover_id, creada): `creada` es True si se han escrito archivos nuevos, para que
+    quien llama sepa si debe borrarlos en caso de error. Retorna (None, False) si no hay imagen.
+    Deja abierta una transacción de escritura (BEGIN IMMEDIATE) que quien llama debe confirmar
+    junto con el cambio que usa la portada: así el barrido de app/core/cover_gc.py no puede
+    borrar una portada sin usar entre que la encontramos aquí y la guardamos en la canción.
+    """
+    variants = None
+    if find_cover(db, source_sha256=source_sha256) is None:
+        # Pillow antes de coger el lock de escritura, para no bloquear a los demás mientras tanto
+        variants = process()
+        if not variants:
+            return None, False
+
+    if not db.in_transaction:
+        db.execute("BEGIN IMMEDIATE")
+    cover = find_cover(db, source_sha256=source_sha256)
+    if cover:
+        return cover['id'], False
+    if variants is None:
+        # El barrido la ha borrado entre las dos búsquedas
+        variants = process()
+        if not variants:
+            return None, False
+
+    # Dos originales distintos pueden dar el mismo JPEG (p.ej. la misma portada con otros metadatos)
+    image_sha256 = hash_bytes(variants['path'])
+    cover = find_cover(db, image_sha256=image_sha256)
+    if cover:
+        return cover['id'], False
+
+    next_cover_id = get_next_id(db, 'cover')
+    paths = save_cover_variants(variants, next_cover_id)
+    try:
+        _insert_covers(db, [(next_cover_id, paths, source_sha256, image_sha256)])
+    except Exception:
+        delete_cover_files(paths)
+        raise
+    return next_cover_id, True
+
+def get_or_create_covers(db, processed_covers):
+    """
+    Versión por lotes de `get_or_create_cover`, para la importación.
+    - processed_covers: {source_sha256: variantes procesadas, o None si la portada ya debería estar guardada}.
+    Busca las existentes con dos consultas (por hash original y por hash del JPEG), y guarda
+    las nuevas con ids reservados de una vez y un solo executemany.
+    Retorna ({source_sha256: cover_id}, [{columna: ruta} de cada portada nueva]). Las que no
+    están guardadas y no traen variantes no aparecen en el resultado.
+    """
+    cover_ids = {}
+    if not processed_covers:
+        return cover_ids, []
+
+    for cover in db.execute(
+        "SELECT id, source_sha256 FROM cover WHERE source_sha256 IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(processed_covers)),)
+    ):
+        cover_ids.setdefault(cover['source_sha256'], cover['id'])
+
+    pending = {
+        source_sha256: variants
+        for source_sha256, variants in processed_covers.items()
+        if source_sha256 not in cover_ids and variants
+    }
+    if not pending:
+        return cover_ids, []
+
+    # Originales distintos pueden dar el mismo JPEG: agrupamos por el hash del JPEG
+    sources_by_image = {}
+    for source_sha256, variants in pending.items():
+        sources_by_image.setdefault(hash_bytes(variants['path']), []).append(source_sha256)
+    for cover in db.execute(
+        "SELECT id, image_sha256 FROM cover WHERE image_sha256 IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(sources_by_image)),)
+    ):
+        for source_sha256 in sources_by_image.pop(cover['image_sha256'], []):
+            cover_ids[source_sha256] = cover['id']
+
+    new_rows = []
+    created_covers = []
+    try:
+        for cover_id, (image_sha256, sources) in zip(reserve_ids(db, 'cover', len(sources_by_image)), sources_by_image.items()):
+            paths = save_cover_variants(pending[sources[0]], cover_id)
+            created_covers.append(paths)
+            new_rows.append((cover_id, paths, sources[0], image_sha256))
+            for source_sha256 in sources:
+                cover_ids[source_sha256] = cover_id
+
+        _insert_covers(db, new_rows)
+    except Exception:
+        for paths in created_covers:
+            delete_cover_files(paths)
+        raise
+    return cover_ids, created_covers
@@ -0,0 +1,178 @@
+# app/core/import_jobs.py
+import threading
+import time
+import uuid
+from app.core.db import get_db
+from app.core.files import discard_staged_file
+from app.core.importer import import_files
+from app.core.loudness import queue_loudness_analysis
+from app.core.song_cache import get_song_records
+from app.core.typeahead import typeahead_index
+
+# Trabajos de importación en segundo plano, con el mismo diseño que los de descarga
+# (ver el docstring de app/api/downloads.py):
+# - JOBS: diccionario global con el estado de cada trabajo.
+# - JOBS_LOCK: mutex para leer y modificar JOBS desde la petición y desde el worker.
+# - Cada trabajo tiene un hilo worker que importa sus archivos por lotes. La petición
+#   de subida responde en cuanto los archivos están en staging, sin esperar al worker.
+#
+# Estados de un archivo:
+# - pending:    en cola.
+# - processing: en el lote que se está importando.
+# - completed:  importado (con su song_id).
+# - duplicate:  ese audio ya estaba en la biblioteca (song_id de la canción existente).
+# - failed:     error al leerlo o guardarlo.
+
+JOBS = {}
+JOBS_LOCK = threading.Lock()
+
+# Archivos que se importan juntos (una transacción y un refresco del progreso por lote)
+IMPORT_JOB_BATCH_SIZE = 25
+
+# Trabajos terminados que se conservan para poder consultar su resultado
+MAX_FINISHED_JOBS = 20
+
+
+def _forget_old_jobs():
+    """Descarta los trabajos terminados más antiguos (llamar con JOBS_LOCK cogido)."""
+    finished = sorted(
+        (job for job in JOBS.values() if not job['is_running']),
+        key=lambda job: job['finished_at']
+    )
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del JOBS[job['id']]
+
+
+def create_import_job(app, staged_files, errors=()):
+    """
+    Crea un trabajo para los archivos ya en staging (mismo formato que `import_files`) y lanza
+    su worker. El trabajo pasa a ser el dueño de esos archivos. `errors` son los archivos que
+    ya fallaron antes (p.ej. no eran MP3) y aparecen en el trabajo como 'failed'.
+    Devuelve el id del trabajo.
+    """
+    job_id = uuid.uuid4().hex
+    files = [
+        {'filename': staged_file['filename'], 'size': staged_file.get('size', 0),
+         'state': 'pending', 'song_id': None, 'error': None}
+        for staged_file in staged_files
+    ]
+    files.extend(
+        {'filename': error['filename'], 'size': 0, 'state': 'failed', 'song_id': None, 'error': error['error']}
+        for error in errors
+    )
+    job = {
+        'id': job_id,
+        'files': files,
+        'is_running': True,
+        'created_at': time.time(),
+        'finished_at': None,
+        'processed_bytes': 0,
+    }
+    with JOBS_LOCK:
+        _forget_old_jobs()
+        JOBS[job_id] = job
+
+    worker = threading.Thread(target=import_worker, args=(job_id, app, list(staged_files)), daemon=True)
+    worker.start()
+    return job_id
+
+
+def _set_state(job, items, state, song_id=None, error=None):
+    for item in items:
+        item['state'] = state
+        item['song_id'] = song_id
+        item['error'] = error
+
+
+def import_worker(job_id, app, staged_files):
+    """
+    Hilo que importa por lotes los archivos de un trabajo y va actualizando su estado.
+    Cada lote pasa por `import_files` (análisis en paralelo y una sola transacción).
+    """
+    job = JOBS[job_id]
+    items = job['files'][:len(staged_files)]
+    position = 0
+    try:
+        with app.app_context():
+            db = get_db()
+            while position < len(staged_files):
+                batch = staged_files[position:position + IMPORT_JOB_BATCH_SIZE]
+                batch_items = items[position:position + IMPORT_JOB_BATCH_SIZE]
+                with JOBS_LOCK:
+                    _set_state(job, batch_items, 'processing')
+
+                try:
+                    imported_ids, errors, _ = import_files(db, batch)
+                except Exception as e:
+                    print(f"Error en el trabajo de importación {job_id}: {e}")
+                    with JOBS_LOCK:
+                        _set_state(job, batch_items, 'failed', error=str(e))
+                        job['processed_bytes'] += sum(item['size'] for item in batch_items)
+                    position += len(batch)
+                    continue
+
+                if imported_ids:
+                    for song in get_song_records(db, imported_ids):
+                        typeahead_index.upsert(song)
+                    queue_loudness_analysis(imported_ids)
+
+                errors_by_name = {}
+                for error in errors:
+                    errors_by_name.setdefault(error['filename'], []).append(error['error'])
+                imported = set(imported_ids)
+                with JOBS_LOCK:
+                    for staged_file, item in zip(batch, batch_items):
+                        song_id = staged_file.get('song_id')
+                        error = '; '.join(errors_by_name.get(staged_file['filename'], [])) or None
+                        if staged_file.get('duplicate'):
+                            _set_state(job, [item], 'duplicate', song_id=song_id)
+                        elif song_id in imported:
+                            # Puede traer un aviso (p.ej. la portada no se pudo leer)
+                            _set_state(job, [item], 'completed', song_id=song_id, error=error)
+                        else:
+                            _set_state(job, [item], 'failed', error=error or 'Import failed')
+                        job['processed_bytes'] += item['size']
+                position += len(batch)
+    finally:
+        # Si el worker se interrumpe, no dejamos archivos de staging sin dueño
+        for staged_file in staged_files[position:]:
+            discard_staged_file(staged_file['path'])
+        with JOBS_LOCK:
+            for item in items[position:]:
+                if item['state'] in ('pending', 'processing'):
+                    _set_state(job, [item], 'failed', error='Import interrupted')
+            job['is_running'] = False
+            job['finished_at'] = time.time()
+
+
+def get_import_job(job_id):
+    """
+    Devuelve una copia del estado de un trabajo (o None si no existe), con el recuento
+    por estado y el ritmo de importación (archivos y bytes por segundo).
+    """
+    with JOBS_LOCK:
+        job = JOBS.get(job_id)
+        if job is None:
+            return None
+        files = [dict(item) for item in job['files']]
+        is_running = job['is_running']
+        created_at = job['created_at']
+        finished_at = job['finished_at']
+        processed_bytes = job['processed_bytes']
+
+    counts = {'pending': 0, 'processing': 0, 'completed': 0, 'duplicate': 0, 'failed': 0}
+    for item in files:
+        counts[item['state']] += 1
+    processed_files = counts['completed'] + counts['duplicate'] + counts['failed']
+
+    elapsed = max((finished_at or time.time()) - created_at, 1e-6)
+    return {
+        'id': job_id,
+        'status': 'running' if is_running else 'finished',
+        'total': len(files),
+        'counts': counts,
+        'files': files,
+        'elapsed_seconds': round(elapsed, 2),
+        'files_per_second': round(processed_files / elapsed, 2),
+        'bytes_per_second': int(processed_bytes / elapsed),
+    }
@@ -0,0 +1,346 @@
+# app/core/importer.py
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.core.covers import process_covers
+from app.core.files import reserve_ids, delete_cover_files, format_id_for_filename, replace_media_file, restore_media_file, discard_staged_file, hash_bytes, get_or_create_covers
+from app.core.metadata import hash_audio_file, read_tags
+from app.core.versions import bump_version
+
+# Pipeline de importación de MP3 en dos fases:
+# 1. Análisis (en paralelo): leer etiquetas y reducir la portada (ver app/core/covers.py). Es lo
+#    que más CPU gasta, y Pillow suelta el GIL mientras decodifica y redimensiona, así que varios
+#    hilos sí rinden.
+# 2. Guardado (en el hilo de la petición): portadas, archivos y filas de las canciones de todo
+#    el lote a la vez, con ids reservados de golpe y executemany, en una única transacción.
+#    Un archivo que no se puede mover a 'media' se salta sin deshacer los demás.
+#
+# Los repetidos se buscan por audio_sha256. Las canciones importadas antes de la migración 0005
+# no lo tienen: se calcula al importar un archivo que dura lo mismo (ver `backfill_audio_hashes`).
+#
+# Las portadas se identifican por el hash de la imagen original: todas las canciones de un
+# disco suelen llevar la misma, así que solo se procesa y guarda una vez (ver get_or_create_covers).
+#
+# Usamos hilos y no procesos porque en Windows cada proceso nuevo volvería a importar
+# run.py (y con él la app entera).
+
+DEFAULT_IMPORT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def analyze_file(file_path, original_filename=None, claim_cover=None):
+    """
+    Fase 1 para un archivo: lee metadatos y portada (en una sola pasada). No toca la base
+    de datos, así que se puede ejecutar en cualquier hilo.
+    `claim_cover(sha256)` decide si hay que procesar la portada (False si ya se conoce o la
+    ha reclamado otro archivo); sin ella se procesa siempre.
+    Devuelve un dict con 'metadata', 'audio_sha256' (hash del audio sin etiquetas),
+    'cover_sha256' (hash de la original o None), 'cover_image' (la original, solo si hay que
+    procesarla), y 'cover_data' y 'cover_error', que rellena después `analyze_files`.
+    """
+    # Sin etiqueta de título usamos el nombre original, no el del archivo temporal
+    fallback_title = os.path.splitext(original_filename)[0] if original_filename else None
+    metadata = read_tags(file_path, fallback_title, hash_audio=True)
+    cover_data = metadata.pop('cover_data')
+    metadata.pop('cover_ext')
+
+    result = {
+        'metadata': metadata, 'audio_sha256': metadata.pop('audio_sha256'),
+        'cover_sha256': None, 'cover_image': None, 'cover_data': None, 'cover_error': None
+    }
+    if cover_data:
+        result['cover_sha256'] = hash_bytes(cover_data)
+        if claim_cover is None or claim_cover(result['cover_sha256']):
+            result['cover_image'] = cover_data
+    return result
+
+
+def analyze_files(staged_files, workers=None, known_cover_hashes=()):
+    """
+    Ejecuta `analyze_file` sobre todos los archivos preparados (ver `import_files`) en un pool de hilos
+    y después procesa las portadas con `process_covers` (que tiene su propio límite de hilos).
+    Cada portada distinta se procesa una sola vez, y ninguna de `known_cover_hashes` (ya guardadas).
+    Devuelve una lista en el mismo orden con (resultado, None) o (None, excepción).
+    """
+    workers = workers or current_app.config.get('IMPORT_WORKERS', DEFAULT_IMPORT_WORKERS)
+    claimed_covers = set(known_cover_hashes)
+    claim_lock = threading.Lock()
+
+    def claim_cover(cover_sha256):
+        with claim_lock:
+            if cover_sha256 in claimed_covers:
+                return False
+            claimed_covers.add(cover_sha256)
+            return True
+
+    def safe_analyze(staged_file):
+        try:
+            return analyze_file(staged_file['path'], staged_file['filename'], claim_cover), None
+        except Exception as e:
+            return None, e
+
+    if workers <= 1 or len(staged_files) <= 1:
+        results = [safe_analyze(staged_file) for staged_file in staged_files]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(staged_files))) as pool:
+            results = list(pool.map(safe_analyze, staged_files))
+
+    # Las portadas reclamadas, cada una en el archivo que la reclamó
+    claimed = {
+        position: analysis.pop('cover_image')
+        for position, (analysis, _) in enumerate(results)
+        if analysis and analysis['cover_image']
+    }
+    failed_covers = {}
+    for position, (variants, cover_error) in process_covers(claimed).items():
+        analysis = results[position][0]
+        analysis['cover_data'] = variants
+        # La canción se importará igualmente, pero sin portada y sabremos por qué
+        analysis['cover_error'] = cover_error
+        if cover_error is not None:
+            failed_covers[analysis['cover_sha256']] = cover_error
+
+    # Los demás archivos con esa misma portada tampoco la tendrán: que lo digan también
+    if failed_covers:
+        for analysis, _ in results:
+            if analysis and analysis['cover_error'] is None and analysis['cover_sha256'] in failed_covers:
+                analysis['cover_error'] = failed_covers[analysis['cover_sha256']]
+    return results
+
+
+def backfill_audio_hashes(db, durations):
+    """
+    Calcula y guarda el audio_sha256 que falta (canciones anteriores a la migración 0005) de las
+    canciones que duran lo mismo que alguno de los archivos a importar: solo esas pueden tener
+    el mismo audio. Cada canción se lee una sola vez (después ya tiene su hash).
+    No confirma la transacción: se guarda junto con la importación. Devuelve cuántas ha calculado.
+    """
+    songs = db.execute(
+        "SELECT id, file_basename FROM song"
+        " WHERE audio_sha256 IS NULL AND IFNULL(duration_ms, 0) IN (SELECT value FROM json_each(?))",
+        (json.dumps(sorted(set(durations))),)
+    ).fetchall()
+    media_folder = current_app.config['MEDIA_FOLDER']
+    rows = []
+    for song in songs:
+        try:
+            rows.append((hash_audio_file(os.path.join(media_folder, song['file_basename'])), song['id']))
+        except OSError as e:
+            print(f"No se pudo calcular el hash del audio de la canción {song['id']}: {e}")
+    db.executemany("UPDATE song SET audio_sha256 = ? WHERE id = ? AND audio_sha256 IS NULL", rows)
+    return len(rows)
+
+
+def find_songs_by_audio(db, audio_hashes):
+    """Devuelve {audio_sha256: id} de las canciones que ya tienen alguno de esos audios (una sola consulta)."""
+    if not audio_hashes:
+        return {}
+    rows = db.execute(
+        "SELECT id, audio_sha256 FROM song WHERE audio_sha256 IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(audio_hashes)),)
+    )
+    found = {}
+    for row in rows:
+        found.setdefault(row['audio_sha256'], row['id'])
+    return found
+
+
+def store_songs(db, ready, processed_covers, errors, duplicates, file_changes):
+    """
+    Fase 2 para todo el lote: [(staged_file, análisis), ...] ya analizados sin errores.
+    Con unas pocas consultas para todo el lote (en vez de varias por archivo):
+    1. Busca de una vez los audios que ya están en la biblioteca (y los repetidos dentro del lote).
+    2. Guarda las portadas nuevas (ver `get_or_create_covers`).
+    3. Reserva los ids de las canciones nuevas, mueve sus MP3 a 'media' y las inserta con executemany.
+    4. Las que traen 'song_id' (ver `import_files`) se actualizan, también con executemany.
+    Debe llamarse dentro de una transacción de escritura. Devuelve los ids guardados, en orden.
+    Los archivos que cambia (MP3 movidos a 'media', con la copia del que sustituyen, y portadas
+    nuevas) quedan apuntados en `file_changes` para deshacerlos si la transacción no se confirma
+    (ver `import_files`).
+    """
+    # Canciones a actualizar que todavía existen
+    replace_ids = [staged_file['song_id'] for staged_file, _ in ready if staged_file.get('song_id') is not None]
+    existing_files = {}
+    if replace_ids:
+        existing_files = {
+            row['id']: row['file_basename']
+            for row in db.execute(
+                "SELECT id, file_basename FROM song WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(replace_ids),)
+            )
+        }
+
+    known_audio = find_songs_by_audio(db, [
+        analysis['audio_sha256'] for staged_file, analysis in ready
+        if staged_file.get('song_id') not in existing_files and analysis['audio_sha256']
+    ])
+
+    ready_order = {id(staged_file): position for position, (staged_file, _) in enumerate(ready)}
+    new_items = []
+    update_items = []
+    batch_audio = {}      # audio_sha256 -> primer archivo del lote con ese audio
+    batch_duplicates = []
+    for staged_file, analysis in ready:
+        if staged_file.get('song_id') in existing_files:
+            staged_file['file_basename'] = existing_files[staged_file['song_id']]
+            update_items.append((staged_file, analysis))
+            continue
+
+        # La canción que tenía asignada ya no existe: se importa como nueva
+        staged_file.pop('song_id', None)
+        audio_sha256 = analysis['audio_sha256']
+        if audio_sha256 in known_audio:
+            staged_file['song_id'] = known_audio[audio_sha256]
+            staged_file['duplicate'] = True
+            duplicates.append({'filename': staged_file['filename'], 'song_id': staged_file['song_id'], 'message': 'Already in library'})
+        elif audio_sha256 and audio_sha256 in batch_audio:
+            batch_duplicates.append((staged_file, batch_audio[audio_sha256]))
+        else:
+            if audio_sha256:
+                batch_audio[audio_sha256] = staged_file
+            new_items.append((staged_file, analysis))
+
+    # Portadas: cada imagen distinta se busca o se guarda una sola vez
+    cover_sources = {}
+    for staged_file, analysis in new_items + update_items:
+        if analysis['cover_error'] is not None:
+            print(f"DEBUG: Error processing cover for {staged_file['filename']}: {analysis['cover_error']}")
+            errors.append({'filename': staged_file['filename'], 'error': f"Cover Error: {analysis['cover_error']}"})
+        elif analysis['cover_sha256']:
+            cover_sha256 = analysis['cover_sha256']
+            cover_sources[cover_sha256] = (
+                analysis['cover_data'] or processed_covers.get(cover_sha256) or cover_sources.get(cover_sha256)
+            )
+    cover_ids, created_covers = get_or_create_covers(db, cover_sources)
+    file_changes['covers'].extend(created_covers)
+
+    def song_values(staged_file, analysis):
+        metadata = analysis['metadata']
+        cover_id = cover_ids.get(analysis['cover_sha256']) if analysis['cover_error'] is None else None
+        return (
+            metadata['title'], metadata['artist'], metadata['album'], metadata['year'], metadata['duration_ms'],
+            cover_id, staged_file.get('sha256'), analysis['audio_sha256']
+        )
+
+    # Canciones nuevas: primero movemos los MP3 (un rename cada uno) y solo insertamos los que han llegado
+    insert_rows = []
+    for song_id, (staged_file, analysis) in zip(reserve_ids(db, 'song', len(new_items)), new_items):
+        final_song_filename = f"{format_id_for_filename(song_id)}.mp3"
+        try:
+            file_changes['moved'].append(replace_media_file(staged_file['path'], final_song_filename))
+        except OSError as e:
+            errors.append({'filename': staged_file['filename'], 'error': str(e)})
+            print(f"DEBUG: Error uploading song {staged_file['filename']}: {e}")
+            continue
+        staged_file['song_id'] = song_id
+        insert_rows.append((song_id,) + song_values(staged_file, analysis) + (final_song_filename, staged_file['filename']))
+
+    db.executemany(
+        "INSERT INTO song (id, title, artist, album, year, duration_ms, cover_id, file_sha256, audio_sha256, file_basename, original_filename)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        insert_rows
+    )
+
+    # Canciones que se actualizan: el archivo original ha cambiado, así que sustituimos el MP3
+    # (el anterior se guarda aparte hasta el commit)
+    update_rows = []
+    for staged_file, analysis in update_items:
+        try:
+            file_changes['moved'].append(replace_media_file(staged_file['path'], staged_file['file_basename']))
+        except OSError as e:
+            errors.append({'filename': staged_file['filename'], 'error': str(e)})
+            print(f"DEBUG: Error updating song {staged_file['filename']}: {e}")
+            continue
+        update_rows.append(song_values(staged_file, analysis) + (staged_file['song_id'],))
+    db.executemany(
+        "UPDATE song SET title = ?, artist = ?, album = ?, year = ?, duration_ms = ?, cover_id = ?, file_sha256 = ?, audio_sha256 = ?,"
+        " loudness_lufs = NULL, peak_dbfs = NULL, loudness_analyzed_at = NULL WHERE id = ?",
+        update_rows
+    )
+
+    # Repetidos dentro del mismo lote: apuntan a la canción que se acaba de guardar
+    for staged_file, first_file in batch_duplicates:
+        if first_file.get('song_id') is not None:
+            staged_file['song_id'] = first_file['song_id']
+            staged_file['duplicate'] = True
+            duplicates.append({'filename': staged_file['filename'], 'song_id': staged_file['song_id'], 'message': 'Already in library'})
+
+    stored_ids = {row[0] for row in insert_rows} | {row[-1] for row in update_rows}
+    stored_files = [staged_file for staged_file, _ in new_items + update_items if staged_file.get('song_id') in stored_ids]
+    stored_files.sort(key=lambda staged_file: ready_order[id(staged_file)])
+    return [staged_file['song_id'] for staged_file in stored_files]
+
+
+def import_files(db, staged_files, workers=None):
+    """
+    Importa una lista de archivos ya guardados en la carpeta de staging. Cada uno es un dict:
+    {'path': ruta en staging, 'filename': nombre original, 'sha256': hash del archivo (opcional)}.
+    Analiza todos en paralelo y después los guarda por lotes (ver `store_songs`) dentro de una
+    sola transacción, que se confirma al final con un único commit.
+    Si la transacción falla, también se deshacen los cambios en los archivos: los MP3 que
+    sustituía vuelven a su sitio y se borran los nuevos y sus portadas.
+    Si un dict trae 'song_id', esa canción se actualiza con el archivo en vez de crear una nueva.
+    Los archivos cuyo audio ya está en la biblioteca (aunque tengan otras etiquetas) no se
+    guardan: se devuelven en `duplicados` junto al id de la canción que ya existe.
+    Al terminar, cada dict lleva en 'song_id' la canción creada, actualizada o ya existente
+    (y 'duplicate': True en este último caso).
+    Devuelve (ids_importados, errores, duplicados) con el mismo formato que la API.
+    Los archivos de staging que no lleguen a importarse se borran siempre al terminar.
+    """
+    imported_ids = []
+    errors = []
+    duplicates = []
+    file_changes = {'moved': [], 'covers': []}
+
+    try:
+        known_cover_hashes = {
+            row[0] for row in db.execute("SELECT source_sha256 FROM cover WHERE source_sha256 IS NOT NULL")
+        }
+        analyses = analyze_files(staged_files, workers, known_cover_hashes)
+        # Cada portada nueva se procesó en un solo archivo del lote; los demás la toman de aquí
+        processed_covers = {
+            analysis['cover_sha256']: analysis['cover_data']
+            for analysis, _ in analyses
+            if analysis and analysis['cover_data']
+        }
+
+        ready = []
+        for staged_file, (analysis, analysis_error) in zip(staged_files, analyses):
+            if analysis_error is not None:
+                errors.append({'filename': staged_file['filename'], 'error': str(analysis_error)})
+                print(f"DEBUG: Error uploading song {staged_file['filename']}: {analysis_error}")
+                continue
+            ready.append((staged_file, analysis))
+
+        if ready:
+            # Antes de coger el lock: leer las canciones antiguas no bloquea a nadie (el UPDATE sí, si hay)
+            backfill_audio_hashes(db, [analysis['metadata']['duration_ms'] or 0 for _, analysis in ready])
+            # IMMEDIATE reserva la escritura desde el principio: dos importaciones a la vez no
+            # pueden leer el mismo MAX(id) al reservar ids (la segunda espera a que acabe la primera)
+            if not db.in_transaction:
+                db.execute("BEGIN IMMEDIATE")
+            imported_ids = store_songs(db, ready, processed_covers, errors, duplicates, file_changes)
+            if imported_ids:
+                bump_version(db, 'library')
+            db.commit()
+    except Exception:
+        db.rollback()
+        # Los archivos vuelven a como estaban: sin MP3 ni portadas nuevas y con los MP3 sustituidos
+        for final_path, backup_path in reversed(file_changes['moved']):
+            try:
+                restore_media_file(final_path, backup_path)
+            except OSError as e:
+                print(f"No se pudo deshacer el cambio de {final_path}: {e}")
+        for cover_paths in file_changes['covers']:
+            delete_cover_files(cover_paths)
+        raise
+    else:
+        # Confirmado: las copias de los MP3 sustituidos ya no hacen falta
+        for _, backup_path in file_changes['moved']:
+            discard_staged_file(backup_path)
+    finally:
+        for staged_file in staged_files:
+            discard_staged_file(staged_file['path'])
+
+    return imported_ids, errors, duplicates
@@ -0,0 +1,211 @@
+# app/core/loudness.py
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.core.db import get_db
+from app.core.song_cache import song_cache
+from app.core.versions import bump_version
+
+# Volumen de cada canción (EBU R128), para que todas suenen parecido en el bot de Discord.
+# - Se mide una sola vez por canción con el filtro ebur128 de ffmpeg y se guarda en `song`
+#   (loudness_lufs, peak_dbfs; ver la migración 0009). Las APIs de canciones ya lo devuelven.
+#   Cuándo se midió va en loudness_analyzed_at (migración 0013): una canción en silencio se
+#   queda con loudness_lufs a NULL y no se vuelve a analizar en cada pasada.
+# - Al importar (subidas y escaneo de la carpeta) las canciones nuevas o cambiadas se ponen
+#   en una cola que analiza un hilo en segundo plano: la importación no espera a ffmpeg.
+#   `flask scan-library` (sin --watch) espera a que se vacíe antes de terminar, porque el hilo
+#   muere con el proceso.
+# - Cada canción la analiza un proceso de ffmpeg aparte; se lanzan LOUDNESS_WORKERS a la vez.
+# - Las canciones que ya estaban en la biblioteca se analizan con `flask analyze-loudness`.
+
+# Volumen al que se lleva cada canción (el de Spotify/YouTube) y pico máximo tras la ganancia
+LOUDNESS_TARGET_LUFS = -14.0
+MAX_TRUE_PEAK_DBFS = -1.0
+# Ganancia máxima, en los dos sentidos (una canción casi en silencio no se sube +40 dB)
+MAX_GAIN_DB = 12.0
+
+# Procesos de ffmpeg que analizan a la vez
+LOUDNESS_WORKERS = min(4, os.cpu_count() or 1)
+
+# Canciones que se guardan juntas (una transacción por lote)
+LOUDNESS_BATCH_SIZE = 50
+
+# El resumen que escribe ebur128 al terminar: nos quedamos con la última aparición
+_INTEGRATED_RE = re.compile(r'I:\s+(-?[\d.]+|-inf) LUFS')
+_PEAK_RE = re.compile(r'Peak:\s+(-?[\d.]+|-inf) dBFS')
+
+# Cola de ids de canciones pendientes y el hilo que la vacía (se arranca al usarla)
+_pending = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _parse_level(matches):
+    if not matches or matches[-1] == '-inf':
+        return None
+    return float(matches[-1])
+
+
+def measure_loudness(ffmpeg, path):
+    """
+    Mide el volumen integrado (LUFS) y el pico real (dBFS) de un archivo de audio.
+    Devuelve (loudness_lufs, peak_dbfs); cualquiera de los dos es None si no hay valor (silencio).
+    Lanza RuntimeError si ffmpeg no puede leer el archivo.
+    """
+    command = [
+        ffmpeg, '-nostdin', '-nostats', '-hide_banner', '-i', path,
+        '-map', '0:a:0', '-filter:a', 'ebur128=peak=true:framelog=quiet', '-f', 'null', '-'
+    ]
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    output = result.stderr.decode('utf-8', 'replace')
+    if result.returncode != 0:
+        raise RuntimeError(output.strip().splitlines()[-1] if output.strip() else f"ffmpeg exited with {result.returncode}")
+    return _parse_level(_INTEGRATED_RE.findall(output)), _parse_level(_PEAK_RE.findall(output))
+
+
+def playback_gain(song):
+    """
+    Factor de volumen (1.0 = sin cambios) que lleva la canción a LOUDNESS_TARGET_LUFS sin que
+    su pico pase de MAX_TRUE_PEAK_DBFS. Sin medida (canción aún sin analizar) devuelve 1.0.
+    """
+    loudness = song.get('loudness_lufs')
+    if loudness is None:
+        return 1.0
+    gain_db = LOUDNESS_TARGET_LUFS - loudness
+    peak = song.get('peak_dbfs')
+    if peak is not None:
+        gain_db = min(gain_db, MAX_TRUE_PEAK_DBFS - peak)
+    gain_db = max(-MAX_GAIN_DB, min(MAX_GAIN_DB, gain_db))
+    return 10 ** (gain_db / 20)
+
+
+def analyze_songs(db, songs, workers=None):
+    """
+    Mide el volumen de `songs` (filas con id, file_basename y file_sha256), con `workers`
+    procesos de ffmpeg a la vez como máximo, y lo guarda en `song`. Devuelve (analizadas, errores).
+    Las que dan error se quedan sin marcar como analizadas y se reintentan la próxima vez.
+    """
+    ffmpeg = current_app.config['FFMPEG_BINARY']
+    media_folder = current_app.config['MEDIA_FOLDER']
+
+    def safe_measure(song):
+        try:
+            return measure_loudness(ffmpeg, os.path.join(media_folder, song['file_basename'])), None
+        except Exception as e:
+            return None, e
+
+    workers = max(1, min(workers or LOUDNESS_WORKERS, len(songs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(safe_measure, songs))
+
+    rows = []
+    errors = 0
+    for song, (levels, error) in zip(songs, results):
+        if error is not None:
+            print(f"No se pudo medir el volumen de la canción {song['id']}: {error}")
+            errors += 1
+            continue
+        rows.append(levels + (song['id'], song['file_sha256']))
+
+    # Solo si el MP3 no ha cambiado mientras se medía (una reimportación cambia su file_sha256)
+    db.executemany(
+        "UPDATE song SET loudness_lufs = ?, peak_dbfs = ?, loudness_analyzed_at = CURRENT_TIMESTAMP"
+        " WHERE id = ? AND file_sha256 IS ?",
+        rows
+    )
+    if rows:
+        bump_version(db, 'library')
+    db.commit()
+
+    for row in rows:
+        song_cache.invalidate(row[2])
+    return len(rows), errors
+
+
+def _songs_to_analyze(db, song_ids):
+    return db.execute(
+        "SELECT id, file_basename, file_sha256 FROM song WHERE id IN (SELECT value FROM json_each(?)) AND loudness_analyzed_at IS NULL",
+        (json.dumps(song_ids),)
+    ).fetchall()
+
+
+def _run_pending(app):
+    """Hilo que analiza las canciones de la cola, por lotes de LOUDNESS_BATCH_SIZE (no termina nunca)."""
+    while True:
+        song_ids = [_pending.get()]
+        while len(song_ids) < LOUDNESS_BATCH_SIZE:
+            try:
+                song_ids.append(_pending.get_nowait())
+            except queue.Empty:
+                break
+        with app.app_context():
+            try:
+                db = get_db()
+                songs = _songs_to_analyze(db, song_ids)
+                if songs:
+                    analyze_songs(db, songs)
+            except Exception as e:
+                print(f"Error al analizar el volumen de las canciones: {e}")
+            finally:
+                for _ in song_ids:
+                    _pending.task_done()
+
+
+def queue_loudness_analysis(song_ids):
+    """
+    Pone en cola el análisis de volumen de unas canciones recién importadas (llamar dentro de
+    un contexto de la aplicación). Si no hay ffmpeg, no hace nada: se quedan sin medida.
+    """
+    if not song_ids:
+        return
+    if shutil.which(current_app.config['FFMPEG_BINARY']) is None:
+        return
+
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_pending, args=(current_app._get_current_object(),), daemon=True)
+            _worker.start()
+    for song_id in song_ids:
+        _pending.put(song_id)
+
+
+def wait_loudness_analysis():
+    """Espera a que el hilo termine de analizar todas las canciones de la cola."""
+    _pending.join()
+
+
+@click.command('analyze-loudness')
+@click.option('--all', 'analyze_all', is_flag=True, help='Measure every song again, not only the ones not analyzed yet.')
+@click.option('--workers', type=int, default=None, help='Number of ffmpeg processes to run at once.')
+@with_appcontext
+def analyze_loudness_command(analyze_all, workers):
+    """Measure the loudness and peak of the songs in the library."""
+    if shutil.which(current_app.config['FFMPEG_BINARY']) is None:
+        raise click.ClickException(f"ffmpeg not found ({current_app.config['FFMPEG_BINARY']})")
+
+    db = get_db()
+    query = "SELECT id, file_basename, file_sha256 FROM song"
+    if not analyze_all:
+        query += " WHERE loudness_analyzed_at IS NULL"
+    songs = db.execute(query + " ORDER BY id").fetchall()
+
+    analyzed = failed = 0
+    for start in range(0, len(songs), LOUDNESS_BATCH_SIZE):
+        done, errors = analyze_songs(db, songs[start:start + LOUDNESS_BATCH_SIZE], workers)
+        analyzed += done
+        failed += errors
+        click.echo(f"Canciones analizadas: {analyzed + failed}/{len(songs)}")
+    click.echo(f"Volumen medido: {analyzed} canciones, {failed} errores")
+
+
+def init_app(app):
+    app.cli.add_command(analyze_loudness_command)
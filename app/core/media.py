@@ -0,0 +1,85 @@
+# app/core/media.py
+import mimetypes
+import os
+from flask import abort, current_app, request, send_file
+from werkzeug.security import safe_join
+from werkzeug.wsgi import wrap_file
+from app.core.db import get_db
+from app.core.files import STAGING_DIRNAME
+
+# Envío de los MP3 de la carpeta 'media' al reproductor.
+# - Range/206: al saltar a otro punto de la canción el navegador pide solo desde ahí.
+# - ETag/Last-Modified: una petición repetida se responde con 304 sin enviar el archivo.
+# - Cache-Control: el reproductor añade a la URL `?v=` con el principio del `file_sha256` de la
+#   canción; como esa URL cambia si el archivo cambia, el navegador la guarda un año sin preguntar.
+#   Solo si `v` es el de la versión actual del archivo: con otro valor, o sin `?v=` (canciones
+#   antiguas sin hash), el navegador la guarda, pero pregunta cada vez.
+# - Las subidas a medias de 'media/.staging' no se sirven.
+# - Sin copias: si el servidor WSGI ofrece `wsgi.file_wrapper` (gunicorn, waitress...), las respuestas
+#   completas (200) se le entregan con él y puede usar sendfile(). Las de un rango (206) las recorta
+#   Werkzeug leyendo por bloques: no todos los servidores cortan el cuerpo en el Content-Length, y
+#   mandar el resto del archivo rompería las conexiones keep-alive. Con el servidor de desarrollo
+#   se lee siempre por bloques.
+#   Con USE_X_SENDFILE (nginx/Apache delante) el archivo lo envía el servidor web, rangos incluidos.
+
+MEDIA_BLOCK_SIZE = 64 * 1024
+
+# Caracteres del file_sha256 que van en `?v=` (los mismos que usa player.js)
+MEDIA_VERSION_LENGTH = 16
+
+
+def media_version(file_sha256):
+    """El valor de `?v=` para un archivo con ese hash ('' si no tiene)."""
+    return (file_sha256 or '')[:MEDIA_VERSION_LENGTH]
+
+
+def _cache_control(response, versioned):
+    if versioned:
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['MEDIA_MAX_AGE']
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+
+
+def send_media_file(filename):
+    """Responde a GET/HEAD /media/<filename> con soporte de Range, validadores y caché."""
+    path = safe_join(current_app.config['MEDIA_FOLDER'], filename)
+    if path is None or filename.split('/', 1)[0] == STAGING_DIRNAME or not os.path.isfile(path):
+        abort(404)
+    song = get_db().execute("SELECT file_sha256 FROM song WHERE file_basename = ?", (filename,)).fetchone()
+    return send_audio_file(path, song['file_sha256'] if song else None)
+
+
+def send_audio_file(path, file_sha256):
+    """
+    Envía un archivo de audio que existe (de 'media' o de la caché de transcodificaciones).
+    `file_sha256` es el hash del MP3 de la canción, para comprobar el `?v=` de la URL.
+    """
+    version = media_version(file_sha256)
+    versioned = bool(version) and request.args.get('v') == version
+
+    if current_app.config['USE_X_SENDFILE']:
+        response = send_file(path, conditional=True)
+        _cache_control(response, versioned)
+        return response
+
+    stat = os.stat(path)
+    media_file = open(path, 'rb')
+    try:
+        response = current_app.response_class(
+            wrap_file(request.environ, media_file, MEDIA_BLOCK_SIZE),
+            mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            direct_passthrough=True
+        )
+        response.content_length = stat.st_size
+        response.set_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+        response.last_modified = int(stat.st_mtime)
+        _cache_control(response, versioned)
+
+        # 304 si el navegador ya lo tiene; 206 + Content-Range si pide un rango (o 416 si no es válido)
+        response.make_conditional(request, accept_ranges=True, complete_length=stat.st_size)
+    except BaseException:
+        media_file.close()
+        raise
+    return response
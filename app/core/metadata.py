@@ -1,103 +1,198 @@
-# app/core/metadata.py
-from mutagen import File as MFile
-import os
-
-def extract_metadata_from_mp3(file_path):
-    """
-    Extrae metadatos (título, artista, álbum, año, duración) de un archivo MP3.
-    Si el archivo no tiene metadatos de título, usa el nombre del archivo sin extensión.
-    """
-    metadata = {
-        'title': '',
-        'artist': '',
-        'album': '',
-        'year': None,
-        'duration_ms': 0
-    }
-
-    try:
-        audio = MFile(file_path, easy=True)
-        if audio:
-            metadata['title'] = audio.get('title', [''])[0].strip()
-            metadata['artist'] = audio.get('artist', [''])[0].strip()
-            metadata['album'] = audio.get('album', [''])[0].strip()
-            
-            # Intentar obtener el año
-            date_str = audio.get('date', [''])[0].strip()
-            if date_str and date_str.isdigit(): # Si es un año numérico directo
-                metadata['year'] = int(date_str)
-            elif date_str and len(date_str) >= 4 and date_str[:4].isdigit(): # Si es una fecha completa como 'YYYY-MM-DD'
-                metadata['year'] = int(date_str[:4])
-            
-            if audio.info:
-                metadata['duration_ms'] = int(audio.info.length * 1000)
-
-        # Si el título sigue vacío, usa el nombre del archivo (sin extensión)
-        if not metadata['title']:
-            base_name = os.path.basename(file_path)
-            metadata['title'] = os.path.splitext(base_name)[0]
-
-    except Exception as e:
-        print(f"Error al extraer metadatos de {file_path}: {e}")
-        # Si hay un error, al menos intenta usar el nombre del archivo como título
-        base_name = os.path.basename(file_path)
-        metadata['title'] = os.path.splitext(base_name)[0]
-
-    return metadata
-
-def extract_metadata_from_mp3(file_path):
-    # ... (esta función no cambia)
-    metadata = {
-        'title': '', 'artist': '', 'album': '', 'year': None, 'duration_ms': 0
-    }
-    try:
-        audio = MFile(file_path, easy=True)
-        if audio:
-            metadata['title'] = audio.get('title', [''])[0].strip()
-            metadata['artist'] = audio.get('artist', [''])[0].strip()
-            metadata['album'] = audio.get('album', [''])[0].strip()
-            date_str = audio.get('date', [''])[0].strip()
-            if date_str and date_str.isdigit():
-                metadata['year'] = int(date_str)
-            elif date_str and len(date_str) >= 4 and date_str[:4].isdigit():
-                metadata['year'] = int(date_str[:4])
-            if audio.info:
-                metadata['duration_ms'] = int(audio.info.length * 1000)
-        if not metadata['title']:
-            base_name = os.path.basename(file_path)
-            metadata['title'] = os.path.splitext(base_name)[0]
-    except Exception as e:
-        print(f"Error al extraer metadatos de {file_path}: {e}")
-        base_name = os.path.basename(file_path)
-        metadata['title'] = os.path.splitext(base_name)[0]
-    return metadata
-
-def get_cover_from_mp3(file_path):
-    """
-    Extrae la primera imagen de portada de un archivo MP3 si existe.
-    VERSIÓN MEJORADA: Busca cualquier tag que empiece con 'APIC:'.
-    """
-    try:
-        audio = MFile(file_path, easy=False)
-        if not audio:
-            return None, None
-
-        # --- LÓGICA MEJORADA ---
-        # Busca cualquier clave que comience con 'APIC:'
-        cover_key = None
-        for key in audio.keys():
-            if key.startswith('APIC:'):
-                cover_key = key
-                break # Nos quedamos con la primera que encontremos
-        
-        if cover_key:
-            apic = audio.get(cover_key)
-            cover_ext = apic.mime.split('/')[-1]
-            return apic.data, cover_ext
-        else:
-            return None, None
-        # --- FIN DE LA LÓGICA MEJORADA ---
-            
-    except Exception as e:
-        print(f"Error crítico al leer el archivo MP3 con Mutagen: {e}")
-        return None, None
+# app/core/metadata.py
+from mutagen import File as MFile
+from mutagen.id3 import ID3, ID3NoHeaderError
+from mutagen.mp3 import MPEGInfo
+import hashlib
+import os
+
+# Tamaño de la etiqueta ID3v1 (siempre 128 bytes al final del archivo, empezando por 'TAG')
+ID3V1_SIZE = 128
+
+def extract_metadata_from_mp3(file_path):
+    """
+    Extrae metadatos (título, artista, álbum, año, duración) de un archivo MP3.
+    Si el archivo no tiene metadatos de título, usa el nombre del archivo sin extensión.
+    """
+    metadata = {
+        'title': '',
+        'artist': '',
+        'album': '',
+        'year': None,
+        'duration_ms': 0
+    }
+
+    try:
+        audio = MFile(file_path, easy=True)
+        if audio:
+            metadata['title'] = audio.get('title', [''])[0].strip()
+            metadata['artist'] = audio.get('artist', [''])[0].strip()
+            metadata['album'] = audio.get('album', [''])[0].strip()
+            
+            # Intentar obtener el año
+            date_str = audio.get('date', [''])[0].strip()
+            if date_str and date_str.isdigit(): # Si es un año numérico directo
+                metadata['year'] = int(date_str)
+            elif date_str and len(date_str) >= 4 and date_str[:4].isdigit(): # Si es una fecha completa como 'YYYY-MM-DD'
+                metadata['year'] = int(date_str[:4])
+            
+            if audio.info:
+                metadata['duration_ms'] = int(audio.info.length * 1000)
+
+        # Si el título sigue vacío, usa el nombre del archivo (sin extensión)
+        if not metadata['title']:
+            base_name = os.path.basename(file_path)
+            metadata['title'] = os.path.splitext(base_name)[0]
+
+    except Exception as e:
+        print(f"Error al extraer metadatos de {file_path}: {e}")
+        # Si hay un error, al menos intenta usar el nombre del archivo como título
+        base_name = os.path.basename(file_path)
+        metadata['title'] = os.path.splitext(base_name)[0]
+
+    return metadata
+
+def get_cover_from_mp3(file_path):
+    """
+    Extrae la primera imagen de portada de un archivo MP3 si existe.
+    VERSIÓN MEJORADA: Busca cualquier tag que empiece con 'APIC:'.
+    """
+    try:
+        audio = MFile(file_path, easy=False)
+        if not audio:
+            return None, None
+
+        # --- LÓGICA MEJORADA ---
+        # Busca cualquier clave que comience con 'APIC:'
+        cover_key = None
+        for key in audio.keys():
+            if key.startswith('APIC:'):
+                cover_key = key
+                break # Nos quedamos con la primera que encontremos
+        
+        if cover_key:
+            apic = audio.get(cover_key)
+            cover_ext = apic.mime.split('/')[-1]
+            return apic.data, cover_ext
+        else:
+            return None, None
+        # --- FIN DE LA LÓGICA MEJORADA ---
+            
+    except Exception as e:
+        print(f"Error crítico al leer el archivo MP3 con Mutagen: {e}")
+        return None, None
+
+def _parse_year(date_str):
+    """Convierte '2001' o '2001-05-12' en 2001. Devuelve None si no hay año."""
+    date_str = (date_str or '').strip()
+    if date_str and date_str.isdigit(): # Si es un año numérico directo
+        return int(date_str)
+    if len(date_str) >= 4 and date_str[:4].isdigit(): # Si es una fecha completa como 'YYYY-MM-DD'
+        return int(date_str[:4])
+    return None
+
+def _first_text(tags, frame_id):
+    """Devuelve el primer texto de un frame ID3 (ej: 'TIT2' = título) o '' si no existe."""
+    frame = tags.get(frame_id) if tags is not None else None
+    if frame is None or not frame.text:
+        return ''
+    return str(frame.text[0]).strip()
+
+def _hash_audio_payload(f, audio_offset):
+    """
+    SHA-256 solo del audio: desde el final de la ID3v2 hasta antes de la ID3v1 (si la hay).
+    Así dos copias del mismo MP3 con etiquetas distintas (otro título, otra portada...) dan el mismo hash.
+    """
+    f.seek(0, os.SEEK_END)
+    audio_end = f.tell()
+    if audio_end - audio_offset >= ID3V1_SIZE:
+        f.seek(audio_end - ID3V1_SIZE)
+        if f.read(3) == b'TAG':
+            audio_end -= ID3V1_SIZE
+
+    audio_hash = hashlib.sha256()
+    f.seek(audio_offset)
+    remaining = audio_end - audio_offset
+    while remaining > 0:
+        chunk = f.read(min(remaining, 1024 * 1024))
+        if not chunk:
+            break
+        audio_hash.update(chunk)
+        remaining -= len(chunk)
+    return audio_hash.hexdigest()
+
+def hash_audio_file(file_path):
+    """
+    Calcula el audio_sha256 de un MP3 ya guardado (ver `_hash_audio_payload`).
+    Lanza OSError si no se puede leer.
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            audio_offset = ID3(f).size
+        except ID3NoHeaderError:
+            audio_offset = 0
+        return _hash_audio_payload(f, audio_offset)
+
+def read_tags(file_path, fallback_title=None, hash_audio=False):
+    """
+    Lee de una sola pasada todo lo que necesitamos de un MP3: textos, duración y portada.
+
+    Sustituye a llamar primero a `extract_metadata_from_mp3` y después a `get_cover_from_mp3`,
+    que abrían y analizaban el archivo dos veces. Aquí el archivo se abre una vez:
+    - La etiqueta ID3v2 se lee entera, pero solo ella (su tamaño viene en la cabecera).
+    - Para la duración se leen unos pocos KB justo después de la etiqueta (primer frame MPEG
+      y cabecera Xing/VBRI); no se recorre el audio.
+
+    Con `hash_audio=True` además se lee el audio entero para calcular su hash (ver
+    `_hash_audio_payload`), aprovechando el mismo archivo abierto.
+
+    Si no hay título se usa `fallback_title` (o el nombre del archivo sin extensión).
+    Devuelve un dict con: title, artist, album, year, duration_ms, cover_data, cover_ext
+    y, si se pidió, audio_sha256.
+    """
+    if fallback_title is None:
+        fallback_title = os.path.splitext(os.path.basename(file_path))[0]
+
+    result = {
+        'title': '', 'artist': '', 'album': '', 'year': None, 'duration_ms': 0,
+        'cover_data': None, 'cover_ext': None
+    }
+    if hash_audio:
+        result['audio_sha256'] = None
+
+    try:
+        with open(file_path, 'rb') as f:
+            try:
+                tags = ID3(f)
+                audio_offset = tags.size
+            except ID3NoHeaderError:
+                tags = None
+                audio_offset = 0
+
+            if tags is not None:
+                result['title'] = _first_text(tags, 'TIT2')
+                result['artist'] = _first_text(tags, 'TPE1')
+                result['album'] = _first_text(tags, 'TALB')
+                result['year'] = _parse_year(_first_text(tags, 'TDRC'))
+
+                # Nos quedamos con la primera imagen (APIC) que haya, sea cual sea su descripción
+                pictures = tags.getall('APIC')
+                if pictures:
+                    result['cover_data'] = pictures[0].data
+                    result['cover_ext'] = pictures[0].mime.split('/')[-1]
+
+            try:
+                info = MPEGInfo(f, audio_offset)
+                result['duration_ms'] = int(info.length * 1000)
+            except Exception as e:
+                print(f"Error al leer la duración de {file_path}: {e}")
+
+            if hash_audio:
+                result['audio_sha256'] = _hash_audio_payload(f, audio_offset)
+
+    except Exception as e:
+        print(f"Error al extraer metadatos de {file_path}: {e}")
+
+    if not result['title']:
+        result['title'] = fallback_title
+
+    return result
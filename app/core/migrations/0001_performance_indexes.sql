@@ -0,0 +1,23 @@
+-- Migración 0001: índices para las consultas más usadas.
+-- Solo añade índices, no toca datos, así que se puede aplicar sobre una biblioteca existente.
+
+-- Estadísticas: `listening-time` filtra por fecha y `top-songs` agrupa por canción.
+-- Incluimos `ms_played` para que SQLite pueda sumar sin leer la tabla (índice "cubriente").
+CREATE INDEX IF NOT EXISTS idx_play_checkpoint_created_at ON play_checkpoint(created_at, ms_played);
+CREATE INDEX IF NOT EXISTS idx_play_checkpoint_song_id ON play_checkpoint(song_id, ms_played);
+
+-- Borrar una canción busca (por el ON DELETE CASCADE) en qué playlists aparece.
+CREATE INDEX IF NOT EXISTS idx_playlist_item_song_id ON playlist_item(song_id);
+
+-- Saber si una portada sigue en uso antes de borrarla.
+CREATE INDEX IF NOT EXISTS idx_song_cover_id ON song(cover_id);
+CREATE INDEX IF NOT EXISTS idx_playlist_cover_id ON playlist(cover_id);
+
+-- Ordenaciones de `list_songs`: cada una termina en `id` para el desempate (y el cursor).
+-- Usan las mismas expresiones que SORT_KEYS en app/api/songs.py para que el índice sirva.
+CREATE INDEX IF NOT EXISTS idx_song_title ON song(title, id);
+CREATE INDEX IF NOT EXISTS idx_song_artist ON song(IFNULL(artist, ''), id);
+CREATE INDEX IF NOT EXISTS idx_song_album ON song(IFNULL(album, ''), id);
+CREATE INDEX IF NOT EXISTS idx_song_added_at ON song(IFNULL(added_at, ''), id);
+CREATE INDEX IF NOT EXISTS idx_song_duration_ms ON song(IFNULL(duration_ms, 0), id);
+CREATE INDEX IF NOT EXISTS idx_song_year ON song(IFNULL(year, 0), id);
@@ -0,0 +1,34 @@
+-- Migración 0002: índice de texto completo (FTS5) para buscar canciones.
+-- - content='song': la tabla virtual no duplica los textos, los lee de `song`.
+-- - unicode61 remove_diacritics 2: "cancion" encuentra "Canción", "rosalia" encuentra "Rosalía".
+-- - prefix='2 3': índices extra para que las búsquedas por prefijo ("ros*") sean instantáneas.
+-- Los triggers mantienen el índice sincronizado con cada INSERT/UPDATE/DELETE de `song`.
+-- (Las bases de datos que ya lo crearon al arrancar no se ven afectadas: todo es IF NOT EXISTS.)
+
+CREATE VIRTUAL TABLE IF NOT EXISTS song_fts USING fts5(
+  title, artist, album,
+  content='song',
+  content_rowid='id',
+  tokenize="unicode61 remove_diacritics 2",
+  prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS song_fts_ai AFTER INSERT ON song BEGIN
+  INSERT INTO song_fts(rowid, title, artist, album)
+  VALUES (new.id, new.title, IFNULL(new.artist, ''), IFNULL(new.album, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_fts_ad AFTER DELETE ON song BEGIN
+  INSERT INTO song_fts(song_fts, rowid, title, artist, album)
+  VALUES ('delete', old.id, old.title, IFNULL(old.artist, ''), IFNULL(old.album, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_fts_au AFTER UPDATE OF title, artist, album ON song BEGIN
+  INSERT INTO song_fts(song_fts, rowid, title, artist, album)
+  VALUES ('delete', old.id, old.title, IFNULL(old.artist, ''), IFNULL(old.album, ''));
+  INSERT INTO song_fts(rowid, title, artist, album)
+  VALUES (new.id, new.title, IFNULL(new.artist, ''), IFNULL(new.album, ''));
+END;
+
+-- Rellena el índice con las canciones que ya existían
+INSERT INTO song_fts(song_fts) VALUES ('rebuild');
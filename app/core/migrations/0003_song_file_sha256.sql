@@ -0,0 +1,5 @@
+-- Migración 0003: SHA-256 del archivo MP3 tal y como se guardó en 'media'.
+-- Se calcula mientras se recibe la subida (sin volver a leer el archivo) y sirve para
+-- comprobar más adelante que el archivo en disco no se ha corrompido ni cambiado.
+-- Las canciones importadas antes de esta migración lo tienen a NULL.
+ALTER TABLE song ADD COLUMN file_sha256 TEXT;
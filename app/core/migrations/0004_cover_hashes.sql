@@ -0,0 +1,10 @@
+-- Migración 0004: portadas direccionadas por contenido.
+-- source_sha256: hash de la imagen original (la que venía en el MP3 o la que se subió).
+-- image_sha256:  hash del JPEG ya procesado que se guarda en 'static/covers'.
+-- Al importar, si la imagen original ya está guardada se reutiliza esa portada sin
+-- volver a pasar por Pillow. Las portadas anteriores a esta migración quedan a NULL.
+ALTER TABLE cover ADD COLUMN source_sha256 TEXT;
+ALTER TABLE cover ADD COLUMN image_sha256 TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_cover_source_sha256 ON cover(source_sha256);
+CREATE INDEX IF NOT EXISTS idx_cover_image_sha256 ON cover(image_sha256);
@@ -0,0 +1,7 @@
+-- Migración 0005: hash del audio de cada canción, sin las etiquetas ID3.
+-- Dos copias del mismo MP3 con otros títulos o portadas tienen el mismo audio_sha256,
+-- así que al importar se detectan los repetidos con una sola búsqueda en el índice.
+-- Las canciones importadas antes de esta migración lo tienen a NULL.
+ALTER TABLE song ADD COLUMN audio_sha256 TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_song_audio_sha256 ON song(audio_sha256);
@@ -0,0 +1,14 @@
+-- Migración 0006: índice de archivos para `flask scan-library` (app/core/scanner.py).
+-- Una fila por cada MP3 visto en una carpeta de la biblioteca, con el tamaño y la fecha de
+-- modificación de la última vez. Si no han cambiado, el archivo no se vuelve a leer.
+CREATE TABLE IF NOT EXISTS library_file (
+  path TEXT PRIMARY KEY,                     -- Ruta absoluta del archivo original.
+  size INTEGER NOT NULL,                     -- Tamaño en bytes cuando se escaneó.
+  mtime_ns INTEGER NOT NULL,                 -- Fecha de modificación (nanosegundos) cuando se escaneó.
+  song_id INTEGER REFERENCES song(id),       -- Canción importada desde este archivo (NULL si falló).
+  missing INTEGER NOT NULL DEFAULT 0,        -- 1 si el archivo ya no estaba en el último escaneo.
+  error TEXT,                                -- Último error al importarlo, si lo hubo.
+  scanned_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_library_file_song_id ON library_file(song_id);
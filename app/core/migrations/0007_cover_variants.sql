@@ -0,0 +1,9 @@
+-- Migración 0007: cada portada se guarda en varios tamaños y formatos.
+-- `path` sigue siendo la grande (500px, JPEG). Las vistas con miniaturas usan las pequeñas
+-- y así no descargan la imagen entera. Los tamaños están en COVER_VARIANTS (app/core/files.py).
+-- Las portadas anteriores a esta migración solo tienen `path` (las demás columnas a NULL).
+ALTER TABLE cover ADD COLUMN path_medium TEXT;  -- 300px, JPEG
+ALTER TABLE cover ADD COLUMN path_small TEXT;   -- 96px, JPEG
+ALTER TABLE cover ADD COLUMN webp_large TEXT;   -- 500px, WebP
+ALTER TABLE cover ADD COLUMN webp_medium TEXT;  -- 300px, WebP
+ALTER TABLE cover ADD COLUMN webp_small TEXT;   -- 96px, WebP
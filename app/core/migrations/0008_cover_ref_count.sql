@@ -0,0 +1,58 @@
+-- Migración 0008: contador de referencias de cada portada.
+-- - ref_count:   cuántas canciones y playlists usan la portada. Lo mantienen los triggers
+--                de abajo, así que nadie tiene que contar con COUNT(*) para saber si sobra.
+-- - released_at: cuándo se quedó sin usos (o cuándo se creó, si aún no la usa nadie).
+-- Las portadas con ref_count = 0 las borra por lotes el barrido de app/core/cover_gc.py,
+-- dejando un margen por si alguien está a punto de volver a usarlas.
+ALTER TABLE cover ADD COLUMN ref_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE cover ADD COLUMN released_at DATETIME;
+
+UPDATE cover SET
+  ref_count = (SELECT COUNT(*) FROM song WHERE song.cover_id = cover.id)
+            + (SELECT COUNT(*) FROM playlist WHERE playlist.cover_id = cover.id),
+  released_at = CURRENT_TIMESTAMP;
+
+-- Solo las portadas sin usar, que es lo único que busca el barrido
+CREATE INDEX IF NOT EXISTS idx_cover_unreferenced ON cover(released_at) WHERE ref_count = 0;
+
+CREATE TRIGGER IF NOT EXISTS cover_ai AFTER INSERT ON cover BEGIN
+  UPDATE cover SET released_at = CURRENT_TIMESTAMP WHERE id = new.id;
+END;
+
+-- Canciones
+CREATE TRIGGER IF NOT EXISTS song_cover_ai AFTER INSERT ON song WHEN new.cover_id IS NOT NULL BEGIN
+  UPDATE cover SET ref_count = ref_count + 1 WHERE id = new.cover_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_cover_ad AFTER DELETE ON song WHEN old.cover_id IS NOT NULL BEGIN
+  UPDATE cover SET ref_count = ref_count - 1,
+    released_at = CASE WHEN ref_count = 1 THEN CURRENT_TIMESTAMP ELSE released_at END
+  WHERE id = old.cover_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS song_cover_au AFTER UPDATE OF cover_id ON song
+WHEN old.cover_id IS NOT new.cover_id BEGIN
+  UPDATE cover SET ref_count = ref_count - 1,
+    released_at = CASE WHEN ref_count = 1 THEN CURRENT_TIMESTAMP ELSE released_at END
+  WHERE id = old.cover_id;
+  UPDATE cover SET ref_count = ref_count + 1 WHERE id = new.cover_id;
+END;
+
+-- Playlists
+CREATE TRIGGER IF NOT EXISTS playlist_cover_ai AFTER INSERT ON playlist WHEN new.cover_id IS NOT NULL BEGIN
+  UPDATE cover SET ref_count = ref_count + 1 WHERE id = new.cover_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS playlist_cover_ad AFTER DELETE ON playlist WHEN old.cover_id IS NOT NULL BEGIN
+  UPDATE cover SET ref_count = ref_count - 1,
+    released_at = CASE WHEN ref_count = 1 THEN CURRENT_TIMESTAMP ELSE released_at END
+  WHERE id = old.cover_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS playlist_cover_au AFTER UPDATE OF cover_id ON playlist
+WHEN old.cover_id IS NOT new.cover_id BEGIN
+  UPDATE cover SET ref_count = ref_count - 1,
+    released_at = CASE WHEN ref_count = 1 THEN CURRENT_TIMESTAMP ELSE released_at END
+  WHERE id = old.cover_id;
+  UPDATE cover SET ref_count = ref_count + 1 WHERE id = new.cover_id;
+END;
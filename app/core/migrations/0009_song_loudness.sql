@@ -0,0 +1,7 @@
+-- Migración 0009: volumen de cada canción, medido una vez con el filtro ebur128 de ffmpeg.
+-- - loudness_lufs: volumen integrado (EBU R128) en LUFS.
+-- - peak_dbfs:     pico real (true peak) en dBFS. NULL si la canción es silencio.
+-- Las dos a NULL mientras no se ha analizado (canciones anteriores a esta migración o
+-- recién importadas): `flask analyze-loudness` rellena las que falten.
+ALTER TABLE song ADD COLUMN loudness_lufs REAL;
+ALTER TABLE song ADD COLUMN peak_dbfs REAL;
@@ -0,0 +1,15 @@
+-- Migración 0010: contadores de versión de los datos (ver app/core/versions.py) en la base de datos.
+-- Antes vivían en la memoria del servidor, así que lo que escribían los comandos
+-- (`flask scan-library`, `flask analyze-loudness`...) desde otro proceso no los cambiaba y el
+-- servidor seguía respondiendo 304 con datos viejos. Ahora cada escritura sube aquí la versión
+-- en su misma transacción, y el servidor la lee en cada petición a la API.
+-- Empiezan en un número al azar: tras un `flask init-db` ningún ETag antiguo puede coincidir.
+CREATE TABLE IF NOT EXISTS data_version (
+  scope TEXT PRIMARY KEY,     -- 'library', 'playlists' o 'stats'
+  version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO data_version (scope, version) VALUES
+  ('library', abs(random() % 1000000000)),
+  ('playlists', abs(random() % 1000000000)),
+  ('stats', abs(random() % 1000000000));
@@ -0,0 +1,6 @@
+-- Migración 0011: identificador que pone el reproductor a cada checkpoint de escucha.
+-- Si el mismo checkpoint llega dos veces (se perdió la respuesta y se reenvió, o dos pestañas
+-- mandaron a la vez los que tenían guardados) el segundo se ignora (INSERT OR IGNORE).
+-- NULL en los anteriores a esta migración y en los de clientes que no lo mandan.
+ALTER TABLE play_checkpoint ADD COLUMN client_id TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_play_checkpoint_client_id ON play_checkpoint(client_id);
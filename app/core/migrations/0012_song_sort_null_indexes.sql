@@ -0,0 +1,11 @@
+-- Migración 0012: los índices de ordenación de canciones con IFNULL, como SORT_KEYS en
+-- app/api/songs.py (las canciones sin artista o sin álbum no salían al paginar por cursor).
+-- Las bibliotecas creadas antes ya tienen los de la 0001 sobre la columna sola: se rehacen.
+DROP INDEX IF EXISTS idx_song_artist;
+DROP INDEX IF EXISTS idx_song_album;
+DROP INDEX IF EXISTS idx_song_added_at;
+DROP INDEX IF EXISTS idx_song_duration_ms;
+CREATE INDEX idx_song_artist ON song(IFNULL(artist, ''), id);
+CREATE INDEX idx_song_album ON song(IFNULL(album, ''), id);
+CREATE INDEX idx_song_added_at ON song(IFNULL(added_at, ''), id);
+CREATE INDEX idx_song_duration_ms ON song(IFNULL(duration_ms, 0), id);
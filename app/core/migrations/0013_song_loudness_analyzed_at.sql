@@ -0,0 +1,6 @@
+-- Migración 0013: fecha en que se midió el volumen de cada canción (UTC).
+-- loudness_lufs se queda en NULL en las canciones en silencio o sin valor medible, así que no
+-- sirve para saber si ya se analizaron: se buscan las que tienen esta columna a NULL.
+-- Se vuelve a NULL cuando el MP3 de la canción cambia. Las ya medidas cuentan como analizadas.
+ALTER TABLE song ADD COLUMN loudness_analyzed_at TEXT;
+UPDATE song SET loudness_analyzed_at = CURRENT_TIMESTAMP WHERE loudness_lufs IS NOT NULL;
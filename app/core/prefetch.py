@@ -0,0 +1,89 @@
+# app/core/prefetch.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.core.song_cache import get_song_records
+
+# Precarga de las próximas canciones de la cola.
+# Con la biblioteca en un disco duro (p.ej. un NAS), al cambiar de canción el navegador
+# espera a que el disco encuentre el principio del MP3 siguiente. Cuando el reproductor
+# empieza una canción manda los ids de las que vienen detrás y aquí:
+# - Se leen sus filas (con las portadas) en una consulta y quedan en la caché de canciones.
+# - Se pide al sistema que lea el principio de sus MP3 (PREFETCH_BYTES) y sus portadas a la
+#   caché de páginas con posix_fadvise(WILLNEED): el kernel los lee en segundo plano y la
+#   petición a /media que llegue después ya no toca el disco. El resto del MP3 lo va pidiendo
+#   el navegador mientras suena, así que no merece la pena leerlo entero (ni sacar de la
+#   caché lo que ya hay por un archivo de 100 MB).
+# - Donde no hay posix_fadvise (Windows) se leen los primeros PREFETCH_FALLBACK_BYTES
+#   de cada archivo, que es lo que el navegador necesita para empezar a sonar.
+# Todo ocurre en un hilo aparte: la petición responde sin esperar al disco.
+
+# Canciones de la cola que se precargan como mucho por petición
+PREFETCH_MAX_SONGS = 3
+
+# Bytes del principio de cada archivo que se piden con posix_fadvise (~1 min de un MP3 a 320 kbps)
+PREFETCH_BYTES = 2 * 1024 * 1024
+
+# Bytes que se leen de cada archivo cuando no hay posix_fadvise
+PREFETCH_FALLBACK_BYTES = 512 * 1024
+
+# Columnas de la fila de la canción con las rutas de sus portadas (ver COVER_FIELDS)
+_COVER_KEYS = ('cover_path', 'cover_medium', 'cover_small', 'cover_large_webp', 'cover_medium_webp', 'cover_small_webp')
+
+# Un solo hilo: con un disco duro, leer varios archivos a la vez es más lento que de uno en uno
+_prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+
+# Archivos que ya están en la cola del hilo (si el reproductor repite la petición, no se duplican)
+_queued = set()
+_queued_lock = threading.Lock()
+
+
+def warm_file(path):
+    """Pide al sistema que lea el principio de un archivo a la caché de páginas. Devuelve False si no existe."""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError:
+        return False
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+        else:
+            os.read(fd, PREFETCH_FALLBACK_BYTES)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+def _warm_queued(path):
+    with _queued_lock:
+        _queued.discard(path)
+    warm_file(path)
+
+
+def song_files(song, media_folder, root_path):
+    """Rutas del MP3 y de las portadas de una canción (primero el MP3, que es lo que más tarda)."""
+    paths = [os.path.join(media_folder, song['file_basename'])]
+    for key in _COVER_KEYS:
+        if song.get(key) and os.path.join(root_path, song[key]) not in paths:
+            paths.append(os.path.join(root_path, song[key]))
+    return paths
+
+
+def prefetch_songs(db, song_ids):
+    """
+    Precarga las próximas canciones (en orden, como mucho PREFETCH_MAX_SONGS) en segundo plano.
+    Devuelve los ids de las canciones que existen, que son las que se van a precargar.
+    """
+    songs = get_song_records(db, song_ids[:PREFETCH_MAX_SONGS])
+    media_folder = current_app.config['MEDIA_FOLDER']
+    for song in songs:
+        for path in song_files(song, media_folder, current_app.root_path):
+            with _queued_lock:
+                if path in _queued:
+                    continue
+                _queued.add(path)
+            _prefetch_pool.submit(_warm_queued, path)
+    return [song['id'] for song in songs]
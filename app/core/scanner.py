@@ -0,0 +1,238 @@
+# app/core/scanner.py
+import os
+import threading
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.core.db import get_db
+from app.core.files import stage_file, discard_staged_file
+from app.core.importer import import_files
+from app.core.loudness import queue_loudness_analysis, wait_loudness_analysis
+from app.core.song_cache import song_cache, get_song_record
+from app.core.typeahead import typeahead_index
+
+# Importación desde una carpeta (por ejemplo, la carpeta de música del NAS).
+# La tabla `library_file` guarda para cada MP3 visto su tamaño y fecha de modificación;
+# al volver a escanear, los que no han cambiado se saltan sin abrirlos, así que repasar
+# una carpeta enorme sin cambios solo cuesta recorrer los directorios.
+#
+# - Archivos nuevos: se copian a staging y pasan por el importador normal.
+# - Archivos cambiados: se vuelven a importar sobre la misma canción.
+# - Archivos que ya no están: se marcan como `missing` (la canción no se borra).
+
+AUDIO_EXTENSIONS = ('.mp3',)
+
+# Nº de archivos que se copian a staging e importan en cada transacción
+SCAN_BATCH_SIZE = 200
+
+
+def iter_audio_files(root):
+    """Recorre `root` recursivamente y devuelve (ruta_absoluta, stat) de cada MP3."""
+    pending = [root]
+    while pending:
+        folder = pending.pop()
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Nos saltamos las carpetas ocultas (p.ej. '.staging' o '.Trash')
+                            if not entry.name.startswith('.'):
+                                pending.append(entry.path)
+                        elif entry.name.lower().endswith(AUDIO_EXTENSIONS) and entry.is_file():
+                            yield entry.path, entry.stat()
+                    except OSError as e:
+                        print(f"No se pudo leer {entry.path}: {e}")
+        except OSError as e:
+            print(f"No se pudo abrir la carpeta {folder}: {e}")
+
+
+def _path_prefix_range(root):
+    """Límites (desde, hasta) para buscar por índice todas las rutas que cuelgan de `root`."""
+    prefix = root.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def _import_batch(db, root, batch, known, summary, workers):
+    """
+    Copia a staging e importa un lote de archivos [(ruta, stat), ...] en una sola transacción,
+    y después guarda en `library_file` el resultado de cada uno.
+    """
+    staged_files = []
+    index_rows = []
+    for path, stat in batch:
+        # Usamos la ruta relativa como nombre: es única dentro de la carpeta y así los errores se distinguen
+        staged_file = {'filename': os.path.relpath(path, root), 'source_path': path, 'stat': stat}
+        previous = known.get(path)
+        if previous is not None and previous['song_id'] is not None:
+            staged_file['song_id'] = previous['song_id']
+        try:
+            staged_file['path'], staged_file['sha256'] = stage_file(path)
+        except OSError as e:
+            summary['errors'].append({'filename': staged_file['filename'], 'error': str(e)})
+            index_rows.append((path, stat.st_size, stat.st_mtime_ns, staged_file.get('song_id'), str(e)))
+            continue
+        staged_files.append(staged_file)
+
+    # Canciones que ya existen y se van a actualizar (para el resumen)
+    replace_ids = [f['song_id'] for f in staged_files if f.get('song_id') is not None]
+    updated_ids = set()
+    if replace_ids:
+        placeholders = ', '.join('?' for _ in replace_ids)
+        updated_ids = {row['id'] for row in db.execute(f"SELECT id FROM song WHERE id IN ({placeholders})", replace_ids)}
+
+    try:
+        imported_ids, errors, _ = import_files(db, staged_files, workers)
+    finally:
+        for staged_file in staged_files:
+            discard_staged_file(staged_file['path'])
+
+    errors_by_name = {error['filename']: error['error'] for error in errors}
+    imported = set(imported_ids)
+    for staged_file in staged_files:
+        song_id = staged_file.get('song_id')
+        stat = staged_file['stat']
+        error = errors_by_name.get(staged_file['filename'])
+        if staged_file.get('duplicate'):
+            # El archivo no es dueño de esa canción: si cambia, se vuelve a comprobar como nuevo
+            summary['duplicates'] += 1
+            song_id = None
+        elif song_id in imported:
+            summary['updated' if song_id in updated_ids else 'new'] += 1
+        index_rows.append((staged_file['source_path'], stat.st_size, stat.st_mtime_ns, song_id, error))
+    summary['errors'].extend(errors)
+
+    db.executemany(
+        "INSERT OR REPLACE INTO library_file (path, size, mtime_ns, song_id, missing, error, scanned_at)"
+        " VALUES (?, ?, ?, ?, 0, ?, CURRENT_TIMESTAMP)",
+        index_rows
+    )
+
+    db.commit()
+
+    if imported_ids:
+        for song_id in imported_ids:
+            song_cache.invalidate(song_id)
+            song = get_song_record(db, song_id)
+            if song:
+                typeahead_index.upsert(song)
+        queue_loudness_analysis(imported_ids)
+
+
+def scan_library(db, root, workers=None, batch_size=SCAN_BATCH_SIZE):
+    """
+    Escanea la carpeta `root` y pone la biblioteca al día con lo que contiene.
+    Devuelve un resumen: {'new', 'updated', 'unchanged', 'missing', 'duplicates', 'errors'}.
+    """
+    root = os.path.abspath(root)
+    summary = {'new': 0, 'updated': 0, 'unchanged': 0, 'missing': 0, 'duplicates': 0, 'errors': []}
+
+    # Lo que sabíamos de esta carpeta (búsqueda por rango sobre la clave primaria)
+    low, high = _path_prefix_range(root)
+    known = {
+        row['path']: row
+        for row in db.execute(
+            "SELECT path, size, mtime_ns, song_id, missing, error FROM library_file WHERE path >= ? AND path < ?",
+            (low, high)
+        )
+    }
+
+    seen = set()
+    reappeared = []
+    batch = []
+    for path, stat in iter_audio_files(root):
+        seen.add(path)
+        previous = known.get(path)
+        # Solo se saltan los que se importaron bien: los que fallaron (o eran duplicados de otra
+        # canción) se vuelven a intentar aunque no hayan cambiado, por si el error era pasajero
+        if (previous is not None and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns
+                and previous['error'] is None and previous['song_id'] is not None):
+            summary['unchanged'] += 1
+            if previous['missing']:
+                reappeared.append((path,))
+            continue
+
+        batch.append((path, stat))
+        if len(batch) >= batch_size:
+            _import_batch(db, root, batch, known, summary, workers)
+            batch = []
+    if batch:
+        _import_batch(db, root, batch, known, summary, workers)
+
+    gone = [(path,) for path, row in known.items() if path not in seen and not row['missing']]
+    summary['missing'] = len(gone)
+    if gone or reappeared:
+        db.executemany("UPDATE library_file SET missing = 1 WHERE path = ?", gone)
+        db.executemany("UPDATE library_file SET missing = 0 WHERE path = ?", reappeared)
+        db.commit()
+
+    return summary
+
+
+def _print_summary(summary):
+    click.echo(
+        f"Nuevas: {summary['new']}, actualizadas: {summary['updated']}, sin cambios: {summary['unchanged']}, "
+        f"ya en la biblioteca: {summary['duplicates']}, desaparecidas: {summary['missing']}, errores: {len(summary['errors'])}"
+    )
+    for error in summary['errors']:
+        click.echo(f"  {error['filename']}: {error['error']}")
+
+
+def watch_library(app, root, interval):
+    """Bucle del vigilante: vuelve a escanear `root` cada `interval` segundos (no termina nunca)."""
+    while True:
+        with app.app_context():
+            try:
+                summary = scan_library(get_db(), root)
+                if summary['new'] or summary['updated'] or summary['missing'] or summary['errors']:
+                    print(f"Escaneo de {root}: {summary['new']} nuevas, {summary['updated']} actualizadas, "
+                          f"{summary['missing']} desaparecidas, {len(summary['errors'])} errores")
+            except Exception as e:
+                print(f"Error al escanear la biblioteca {root}: {e}")
+        time.sleep(interval)
+
+
+def start_library_watcher(app):
+    """
+    Arranca el vigilante en un hilo aparte si `LIBRARY_WATCH_DIR` está configurado.
+    Devuelve el hilo (o None si no hay carpeta que vigilar).
+    """
+    root = app.config.get('LIBRARY_WATCH_DIR')
+    if not root:
+        return None
+    watcher_thread = threading.Thread(
+        target=watch_library,
+        args=(app, root, app.config['LIBRARY_WATCH_INTERVAL']),
+        daemon=True
+    )
+    watcher_thread.start()
+    return watcher_thread
+
+
+@click.command('scan-library')
+@click.argument('folder', type=click.Path(exists=True, file_okay=False))
+@click.option('--watch', is_flag=True, help='Keep running and rescan the folder periodically.')
+@click.option('--interval', type=int, default=None, help='Seconds between rescans with --watch.')
+@with_appcontext
+def scan_library_command(folder, watch, interval):
+    """Import new and changed MP3 files from a folder and mark removed ones."""
+    started = time.perf_counter()
+    summary = scan_library(get_db(), folder)
+    _print_summary(summary)
+    click.echo(f"Escaneo terminado en {time.perf_counter() - started:.1f} s")
+    if not watch:
+        # El análisis de volumen va en un hilo que muere al salir: esperamos a que acabe
+        if summary['new'] or summary['updated']:
+            click.echo("Midiendo el volumen de las canciones importadas...")
+        wait_loudness_analysis()
+        return
+
+    interval = interval or current_app.config['LIBRARY_WATCH_INTERVAL']
+    click.echo(f"Vigilando {folder} cada {interval} s (Ctrl+C para salir)...")
+    time.sleep(interval)
+    watch_library(current_app._get_current_object(), folder, interval)
+
+
+def init_app(app):
+    app.cli.add_command(scan_library_command)
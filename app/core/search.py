@@ -0,0 +1,29 @@
+# app/core/search.py
+import re
+
+# El índice FTS5 (`song_fts`) y sus triggers se crean en app/core/migrations/0002_song_fts.sql.
+
+# Pesos BM25 de cada columna (título, artista, álbum): un acierto en el título pesa más.
+BM25_WEIGHTS = (10.0, 5.0, 2.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(text):
+    """
+    Convierte lo que escribe el usuario en una expresión MATCH de FTS5.
+    Cada palabra se busca como prefijo y todas deben aparecer (AND implícito):
+    "rosa mal" -> '"rosa"* "mal"*'.
+    Devuelve None si el texto no contiene ninguna palabra buscable.
+    """
+    tokens = _TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    # Entre comillas para que palabras como AND/OR/NEAR no se interpreten como operadores
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def bm25_expression(table='song_fts'):
+    """Devuelve la expresión SQL de ranking BM25 (menor = más relevante)."""
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    return f"bm25({table}, {weights})"
@@ -0,0 +1,145 @@
+# app/core/song_cache.py
+import json
+import threading
+from collections import OrderedDict
+
+# Columnas de la portada (tabla `cover` con alias `c`) que devuelven las APIs: la grande
+# (`cover_path`), la mediana y la pequeña en JPEG y las tres en WebP. Las portadas guardadas
+# antes de que existieran las variantes solo tienen la grande, así que se usa esa.
+COVER_FIELDS = (
+    "c.path as cover_path, COALESCE(c.path_medium, c.path) as cover_medium, COALESCE(c.path_small, c.path) as cover_small, "
+    "c.webp_large as cover_large_webp, c.webp_medium as cover_medium_webp, c.webp_small as cover_small_webp"
+)
+
+# La consulta que lee una canción con la ruta de su portada. Es la misma que usaban
+# por separado el reproductor, la ficha de canción, la edición y la importación.
+SONG_BY_ID_QUERY = f"SELECT s.*, {COVER_FIELDS} FROM song s LEFT JOIN cover c ON s.cover_id = c.id WHERE s.id = ?"
+
+# La misma consulta para una lista de ids. json_each convierte la lista en una tabla
+# (posición, id): cada id se busca por la clave primaria y el ORDER BY por posición
+# mantiene el orden pedido, sin límite de parámetros.
+SONGS_BY_IDS_QUERY = f"""
+    SELECT s.*, {COVER_FIELDS}
+    FROM json_each(?) AS requested
+    JOIN song s ON s.id = requested.value
+    LEFT JOIN cover c ON s.cover_id = c.id
+    ORDER BY requested.key
+"""
+
+
+class SongCache:
+    """
+    Caché LRU (la canción usada hace más tiempo es la primera en salir) de filas de canción.
+    Guarda diccionarios ya convertidos, así que un acierto no toca SQLite.
+    Es compartida por todos los hilos del servidor, por eso todo va protegido con un lock.
+
+    La lectura de SQLite se hace fuera del lock, así que entre el SELECT y el `put` otra
+    petición puede editar o borrar la canción e invalidarla. Para no guardar esa fila vieja,
+    cada invalidación sube `_generation`: quien lee anota la generación antes del SELECT y
+    `put` descarta la fila si ha cambiado mientras tanto.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, maxsize):
+        """Cambia el tamaño máximo (0 desactiva la caché) y descarta lo que sobre."""
+        with self._lock:
+            self.maxsize = max(0, int(maxsize))
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get(self, db, song_id):
+        """
+        Devuelve la canción `song_id` como diccionario (o None si no existe).
+        Si no está en caché, la lee de la base de datos y la guarda.
+        Siempre devuelve una copia para que quien la use pueda modificarla sin ensuciar la caché.
+        """
+        with self._lock:
+            song = self._items.get(song_id)
+            if song is not None:
+                self._items.move_to_end(song_id)
+                self.hits += 1
+                return dict(song)
+            self.misses += 1
+            generation = self._generation
+
+        row = db.execute(SONG_BY_ID_QUERY, (song_id,)).fetchone()
+        if row is None:
+            return None
+
+        song = dict(row)
+        self.put(song, generation)
+        return dict(song)
+
+    def generation(self):
+        """Generación actual: anotarla antes de leer de la base de datos y pasársela a `put`."""
+        with self._lock:
+            return self._generation
+
+    def put(self, song, generation):
+        """
+        Guarda (o refresca) una canción leída de la base de datos cuando la generación era
+        `generation`. Si desde entonces se ha invalidado algo, no se guarda (podría estar vieja).
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._items[song['id']] = dict(song)
+            self._items.move_to_end(song['id'])
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, song_id):
+        """Olvida una canción (hay que llamarlo después de editarla o borrarla)."""
+        with self._lock:
+            self._generation += 1
+            self._items.pop(song_id, None)
+
+    def clear(self):
+        """Vacía la caché por completo (por ejemplo, después de `flask init-db`)."""
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+
+    def stats(self):
+        """Contadores para poder dimensionar la caché."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._items),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Instancia única compartida por todos los endpoints
+song_cache = SongCache()
+
+
+def get_song_record(db, song_id):
+    """Atajo para leer una canción (con `cover_path`) a través de la caché compartida."""
+    return song_cache.get(db, song_id)
+
+
+def get_song_records(db, song_ids):
+    """
+    Lee varias canciones (con `cover_path`) en una sola consulta, en el orden pedido.
+    Los ids que no existen se omiten. Deja todas en la caché para cuando empiecen a sonar.
+    """
+    if not song_ids:
+        return []
+    generation = song_cache.generation()
+    songs = [dict(row) for row in db.execute(SONGS_BY_IDS_QUERY, (json.dumps(list(song_ids)),))]
+    for song in songs:
+        song_cache.put(song, generation)
+    return songs
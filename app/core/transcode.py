@@ -0,0 +1,197 @@
+# app/core/transcode.py
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from flask import current_app, jsonify, request
+from app.core.db import get_db
+from app.core.files import format_id_for_filename
+from app.core.media import media_version, send_audio_file
+from app.core.song_cache import get_song_record
+
+# /media/<id>?bitrate=96|128|192&format=opus|mp3: la canción recodificada con ffmpeg para
+# escuchar con poca conexión (p.ej. desde el móvil).
+# - La primera vez, la salida de ffmpeg se envía al cliente a la vez que se escribe en la caché
+#   (TRANSCODE_FOLDER), así que la reproducción empieza sin esperar a que termine.
+# - Las siguientes veces es un archivo normal: se sirve como los de 'media' (Range, ETag...).
+# - La caché tiene un tamaño máximo (TRANSCODE_CACHE_SIZE); al pasarse se borran los archivos
+#   usados hace más tiempo. Cada acierto actualiza la fecha de acceso (atime) del archivo,
+#   y no la de modificación, que es la que forma el ETag.
+# - El nombre de cada archivo lleva la canción, el hash de su MP3, el bitrate y el formato:
+#   si el MP3 cambia, la transcodificación antigua deja de usarse y acaba saliendo por LRU.
+
+# formato -> (códec de ffmpeg, contenedor de ffmpeg, extensión del archivo en caché)
+TRANSCODE_FORMATS = {
+    'mp3': ('libmp3lame', 'mp3', 'mp3'),
+    'opus': ('libopus', 'ogg', 'ogg'),
+}
+TRANSCODE_BITRATES = (96, 128, 192)
+DEFAULT_TRANSCODE_FORMAT = 'mp3'
+DEFAULT_TRANSCODE_BITRATE = 128
+
+TRANSCODE_CHUNK_SIZE = 64 * 1024
+
+# Transcodificaciones que se están escribiendo en la caché ahora mismo (por nombre de archivo)
+_in_progress = set()
+_in_progress_lock = threading.Lock()
+
+
+def get_transcode_folder():
+    folder = current_app.config['TRANSCODE_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def transcode_filename(song, source_path, audio_format, bitrate):
+    """Nombre en la caché para (canción, formato, bitrate), p.ej. '0042-3f2a...-96k.ogg'."""
+    version = media_version(song.get('file_sha256'))
+    if not version:
+        # Canciones importadas antes de guardar el hash: vale con el tamaño y la fecha del MP3
+        stat = os.stat(source_path)
+        version = f"{stat.st_mtime_ns:x}{stat.st_size:x}"
+    extension = TRANSCODE_FORMATS[audio_format][2]
+    return f"{format_id_for_filename(song['id'])}-{version}-{bitrate}k.{extension}"
+
+
+def ffmpeg_command(source_path, audio_format, bitrate):
+    codec, container, _ = TRANSCODE_FORMATS[audio_format]
+    return [
+        current_app.config['FFMPEG_BINARY'], '-nostdin', '-v', 'error',
+        '-i', source_path, '-map', '0:a:0', '-vn',
+        '-c:a', codec, '-b:a', f'{bitrate}k', '-f', container, 'pipe:1'
+    ]
+
+
+def touch_cached_file(path):
+    """Marca un archivo de la caché como recién usado (solo cambia la fecha de acceso)."""
+    try:
+        os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+    except OSError:
+        pass
+
+
+def enforce_cache_limit(folder, max_bytes):
+    """Borra los archivos de la caché usados hace más tiempo hasta que ocupen `max_bytes` como mucho."""
+    entries = []
+    total = 0
+    with os.scandir(folder) as it:
+        for entry in it:
+            if not entry.is_file() or entry.name.endswith('.part'):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_atime, stat.st_size, entry.path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return
+
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"No se pudo borrar {path} de la caché de transcodificaciones: {e}")
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def stream_transcode(command, cache_path, max_cache_bytes):
+    """
+    Generador que lanza ffmpeg y devuelve su salida por bloques. La va escribiendo también en
+    un '.part' que, si ffmpeg termina bien, pasa a ser `cache_path`.
+    Si el cliente se desconecta antes, se para ffmpeg y no se guarda nada.
+    Si otra petición ya está escribiendo ese mismo archivo, esta solo transcodifica para su cliente.
+    """
+    with _in_progress_lock:
+        if cache_path in _in_progress:
+            cache_path = None
+        else:
+            _in_progress.add(cache_path)
+
+    folder = os.path.dirname(cache_path) if cache_path else None
+    part_path = None
+    part_file = None
+    process = None
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        if cache_path:
+            fd, part_path = tempfile.mkstemp(suffix='.part', dir=folder)
+            part_file = os.fdopen(fd, 'wb')
+
+        while True:
+            chunk = process.stdout.read(TRANSCODE_CHUNK_SIZE)
+            if not chunk:
+                break
+            if part_file:
+                part_file.write(chunk)
+            yield chunk
+
+        returncode = process.wait()
+        if returncode != 0:
+            print(f"ffmpeg terminó con el código {returncode}: {' '.join(command)}")
+        elif part_file:
+            part_file.close()
+            os.replace(part_path, cache_path)
+            part_path = None
+            enforce_cache_limit(folder, max_cache_bytes)
+    finally:
+        if process is not None:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+        if part_file:
+            part_file.close()
+        if part_path:
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+        if cache_path:
+            with _in_progress_lock:
+                _in_progress.discard(cache_path)
+
+
+def send_transcoded_song(song_id):
+    """
+    Responde a /media/<id>. Sin `bitrate` ni `format` envía el MP3 original; con alguno de
+    los dos, la versión transcodificada (de la caché si ya existe).
+    """
+    song = get_song_record(get_db(), song_id)
+    if song is None:
+        return jsonify({'error': 'Song not found'}), 404
+    source_path = os.path.join(current_app.config['MEDIA_FOLDER'], song['file_basename'])
+    if not os.path.isfile(source_path):
+        return jsonify({'error': 'Media file not found'}), 404
+
+    if 'bitrate' not in request.args and 'format' not in request.args:
+        return send_audio_file(source_path, song.get('file_sha256'))
+
+    audio_format = request.args.get('format', DEFAULT_TRANSCODE_FORMAT)
+    if audio_format not in TRANSCODE_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(TRANSCODE_FORMATS)}"}), 400
+    bitrate = request.args.get('bitrate', DEFAULT_TRANSCODE_BITRATE, type=int)
+    if bitrate not in TRANSCODE_BITRATES:
+        return jsonify({'error': f"bitrate must be one of: {', '.join(map(str, TRANSCODE_BITRATES))}"}), 400
+
+    cache_path = os.path.join(get_transcode_folder(), transcode_filename(song, source_path, audio_format, bitrate))
+    if os.path.isfile(cache_path):
+        touch_cached_file(cache_path)
+        return send_audio_file(cache_path, song.get('file_sha256'))
+
+    if shutil.which(current_app.config['FFMPEG_BINARY']) is None:
+        return jsonify({'error': 'Transcoding is not available (ffmpeg not found)'}), 503
+
+    command = ffmpeg_command(source_path, audio_format, bitrate)
+    response = current_app.response_class(
+        stream_transcode(command, cache_path, current_app.config['TRANSCODE_CACHE_SIZE']),
+        mimetype='audio/mpeg' if audio_format == 'mp3' else 'audio/ogg',
+        direct_passthrough=True
+    )
+    # Mientras se transcodifica no hay tamaño ni rangos; en cuanto esté en caché, sí
+    response.accept_ranges = 'none'
+    response.cache_control.no_store = True
+    return response
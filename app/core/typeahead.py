@@ -0,0 +1,220 @@
+# app/core/typeahead.py
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+
+# Índice en memoria para las sugerencias mientras se escribe (/api/songs/suggest).
+# Cada palabra normalizada (minúsculas, sin tildes) de título, artista y álbum apunta a las
+# canciones que la contienen. Las palabras se guardan además en una lista ordenada, así que
+# todas las que empiezan por un prefijo están juntas y se encuentran con una búsqueda binaria.
+# Se construye al arrancar y lo mantienen al día los endpoints que escriben canciones.
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Bits que indican en qué campo aparece una palabra (título pesa más que artista, y este más que álbum)
+FIELD_TITLE = 1
+FIELD_ARTIST = 2
+FIELD_ALBUM = 4
+_FIELDS = (('title', FIELD_TITLE), ('artist', FIELD_ARTIST), ('album', FIELD_ALBUM))
+
+# Longitud mínima para buscar una palabra como prefijo
+MIN_PREFIX_LENGTH = 2
+
+
+def normalize(text):
+    """Pasa un texto a minúsculas y sin tildes: 'Canción Ñoña' -> 'cancion nona'."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def tokenize(text):
+    """Divide un texto normalizado en palabras."""
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _field_rank(mask):
+    """0 si la palabra está en el título, 1 si en el artista, 2 si solo en el álbum."""
+    if mask & FIELD_TITLE:
+        return 0
+    if mask & FIELD_ARTIST:
+        return 1
+    return 2
+
+
+class TypeaheadIndex:
+    """Índice de prefijos sobre las canciones de la biblioteca."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._songs = {}      # song_id -> datos que devolvemos en las sugerencias
+        self._song_tokens = {}  # song_id -> {palabra: bits de campo}, para poder quitarla luego
+        self._postings = {}   # palabra -> {song_id: bits de campo}
+        self._tokens = []     # todas las palabras distintas, ordenadas
+
+    def load(self, db):
+        """(Re)construye el índice completo leyendo todas las canciones de la base de datos."""
+        rows = db.execute(
+            "SELECT s.id, s.title, s.artist, s.album, s.cover_id, c.path as cover_path, "
+            "COALESCE(c.path_small, c.path) as cover_small, c.webp_small as cover_small_webp "
+            "FROM song s LEFT JOIN cover c ON s.cover_id = c.id"
+        )
+        with self._lock:
+            self._songs.clear()
+            self._song_tokens.clear()
+            self._postings.clear()
+            for row in rows:
+                self._add(dict(row))
+            self._tokens = sorted(self._postings)
+
+    def clear(self):
+        """Vacía el índice (por ejemplo, después de `flask init-db`)."""
+        with self._lock:
+            self._songs.clear()
+            self._song_tokens.clear()
+            self._postings.clear()
+            self._tokens = []
+
+    def upsert(self, song):
+        """Añade una canción o actualiza sus datos (recibe un dict con id, title, artist, album...)."""
+        with self._lock:
+            self._remove(song['id'])
+            new_tokens = self._add(song)
+            for token in new_tokens:
+                bisect.insort(self._tokens, token)
+
+    def remove(self, song_id):
+        """Quita una canción borrada."""
+        with self._lock:
+            self._remove(song_id)
+
+    def search(self, query, limit=10):
+        """
+        Devuelve las `limit` mejores canciones cuyas palabras empiezan por las del texto buscado.
+        Todas las palabras deben coincidir. Se ordenan por: coincidencia al inicio del título,
+        campo donde aparece cada palabra (título > artista > álbum), palabra completa y título.
+        """
+        terms = tokenize(query)
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            matches_per_term = [self._prefix_matches(term) for term in terms]
+            # Empezamos por el término con menos candidatos para que la intersección sea barata
+            matches_per_term.sort(key=len)
+            candidates = set(matches_per_term[0])
+            for matches in matches_per_term[1:]:
+                candidates.intersection_update(matches)
+                if not candidates:
+                    return []
+
+            normalized_query = ' '.join(terms)
+
+            def score(song_id):
+                song = self._songs[song_id]
+                field_score = 0
+                partial_words = 0
+                for matches in matches_per_term:
+                    mask, exact = matches[song_id]
+                    field_score += _field_rank(mask)
+                    partial_words += 0 if exact else 1
+                starts_title = 0 if song['title_key'].startswith(normalized_query) else 1
+                return (starts_title, field_score, partial_words, song['title_key'], song_id)
+
+            best = heapq.nsmallest(limit, candidates, key=score)
+            return [self._public(self._songs[song_id]) for song_id in best]
+
+    def stats(self):
+        """Tamaño del índice."""
+        with self._lock:
+            return {'songs': len(self._songs), 'tokens': len(self._tokens)}
+
+    # --- Métodos internos (se llaman con el lock ya cogido) ---
+
+    def _add(self, song):
+        """Indexa una canción. Devuelve las palabras que no existían antes en el índice."""
+        song_id = song['id']
+        entry = {
+            'id': song_id,
+            'title': song.get('title') or '',
+            'artist': song.get('artist') or '',
+            'album': song.get('album') or '',
+            'cover_id': song.get('cover_id'),
+            'cover_path': song.get('cover_path'),
+            # Las sugerencias solo muestran la miniatura
+            'cover_small': song.get('cover_small'),
+            'cover_small_webp': song.get('cover_small_webp'),
+        }
+        entry['title_key'] = ' '.join(tokenize(entry['title']))
+        self._songs[song_id] = entry
+
+        token_masks = {}
+        for field, bit in _FIELDS:
+            for token in tokenize(entry[field]):
+                token_masks[token] = token_masks.get(token, 0) | bit
+        self._song_tokens[song_id] = token_masks
+
+        new_tokens = []
+        for token, mask in token_masks.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                new_tokens.append(token)
+            posting[song_id] = mask
+        return new_tokens
+
+    def _remove(self, song_id):
+        token_masks = self._song_tokens.pop(song_id, None)
+        self._songs.pop(song_id, None)
+        if not token_masks:
+            return
+        for token in token_masks:
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(song_id, None)
+            if not posting:
+                del self._postings[token]
+                index = bisect.bisect_left(self._tokens, token)
+                if index < len(self._tokens) and self._tokens[index] == token:
+                    del self._tokens[index]
+
+    def _prefix_matches(self, term):
+        """Devuelve {song_id: (bits de campo, ¿palabra completa?)} de las palabras que empiezan por `term`."""
+        matches = {}
+        if len(term) < MIN_PREFIX_LENGTH:
+            # Una sola letra como prefijo coincide con media biblioteca: solo buscamos la palabra exacta
+            for song_id, mask in self._postings.get(term, {}).items():
+                matches[song_id] = (mask, True)
+            return matches
+        start = bisect.bisect_left(self._tokens, term)
+        for index in range(start, len(self._tokens)):
+            token = self._tokens[index]
+            if not token.startswith(term):
+                break
+            exact = token == term
+            for song_id, mask in self._postings[token].items():
+                previous = matches.get(song_id)
+                if previous is None:
+                    matches[song_id] = (mask, exact)
+                else:
+                    matches[song_id] = (previous[0] | mask, previous[1] or exact)
+        return matches
+
+    @staticmethod
+    def _public(entry):
+        return {
+            'id': entry['id'],
+            'title': entry['title'],
+            'artist': entry['artist'],
+            'album': entry['album'],
+            'cover_id': entry['cover_id'],
+            'cover_path': entry['cover_path'],
+            'cover_small': entry['cover_small'],
+            'cover_small_webp': entry['cover_small_webp'],
+        }
+
+
+# Instancia única compartida por toda la app
+typeahead_index = TypeaheadIndex()
@@ -0,0 +1,151 @@
+# app/core/versions.py
+import json
+import sqlite3
+import threading
+from datetime import date
+from functools import wraps
+from flask import g, request, make_response
+
+# Contadores de versión de los datos que muestra la SPA.
+# Cada escritura sube el contador de lo que ha cambiado y los GET usan esos números como
+# ETag: si el navegador ya tiene esa versión, respondemos 304 sin volver a generar el JSON.
+#
+# - library:   canciones, portadas de canciones y favoritas.
+# - playlists: playlists y su contenido.
+# - stats:     historial de escucha.
+#
+# Los contadores están en la tabla `data_version` (migración 0010) y se suben en la misma
+# transacción que la escritura, así que también cuentan los cambios de los comandos
+# (`flask scan-library`, `flask analyze-loudness`...), que corren en otro proceso.
+# Al principio de cada petición a la API se leen (ver `sync_versions`): si `library` ha
+# cambiado sin que lo haya cambiado este proceso, se vacía la caché de canciones y se
+# vuelve a cargar el índice de sugerencias, que solo se actualizan solos con las escrituras
+# hechas por el propio servidor.
+# Versiones que corresponden a lo que tienen las cachés en memoria de este proceso
+_known = {}
+# Ámbitos que otro proceso cambió justo antes de que este los subiera (ver `bump_version`)
+_stale = set()
+_lock = threading.Lock()
+
+
+def bump_version(db, *scopes):
+    """
+    Sube la versión de uno o varios ámbitos dentro de la transacción de `db`.
+    Llamar ANTES del commit de la escritura, para que las dos cosas se confirmen juntas.
+    """
+    db.execute(
+        "UPDATE data_version SET version = version + 1 WHERE scope IN (SELECT value FROM json_each(?))",
+        (json.dumps(scopes),)
+    )
+    # La transacción tiene ya el lock de escritura: nadie más puede subirlas hasta el commit
+    rows = db.execute(
+        "SELECT scope, version FROM data_version WHERE scope IN (SELECT value FROM json_each(?))",
+        (json.dumps(scopes),)
+    ).fetchall()
+    with _lock:
+        for scope, version in rows:
+            if _known.get(scope) != version - 1:
+                # Otro proceso la había subido antes y este no se había enterado
+                _stale.add(scope)
+            _known[scope] = version
+
+
+def read_versions(db):
+    """Devuelve {ámbito: versión} tal como está en la base de datos."""
+    return {scope: version for scope, version in db.execute("SELECT scope, version FROM data_version")}
+
+
+def sync_versions(db):
+    """
+    Lee las versiones (una vez por petición, se guardan en `g`) y, si otro proceso ha cambiado
+    la biblioteca, descarta la caché de canciones y recarga el índice de sugerencias.
+    """
+    versions = read_versions(db)
+    g.data_versions = versions
+    with _lock:
+        changed = {scope for scope, version in versions.items() if _known.get(scope) != version} | _stale
+        _known.update(versions)
+        _stale.clear()
+
+    if 'library' in changed:
+        # Importados aquí: song_cache y typeahead no dependen de este módulo, pero db.py sí
+        from app.core.song_cache import song_cache
+        from app.core.typeahead import typeahead_index
+        song_cache.clear()
+        typeahead_index.load(db)
+    return versions
+
+
+def reset_versions(db):
+    """Da por buenas las versiones actuales (al arrancar, o después de `flask init-db`)."""
+    versions = read_versions(db)
+    with _lock:
+        _known.clear()
+        _known.update(versions)
+        _stale.clear()
+
+
+def get_version(scope):
+    """Devuelve la versión actual de un ámbito (la leída en esta petición si ya se leyó)."""
+    versions = g.get('data_versions')
+    if versions is None:
+        from app.core.db import get_db
+        versions = sync_versions(get_db())
+    return versions[scope]
+
+
+def build_etag(scopes, daily=False):
+    """
+    Construye el ETag a partir de las versiones de los ámbitos indicados.
+    Con `daily=True` también incluye la fecha de hoy, para las vistas que
+    dependen de "los últimos N días" y cambian aunque nadie escriba.
+    """
+    parts = [str(get_version(scope)) for scope in scopes]
+    if daily:
+        parts.append(date.today().isoformat())
+    return '.'.join(parts)
+
+
+def etag_versioned(*scopes, daily=False):
+    """
+    Decorador para GET de solo lectura: responde 304 si el `If-None-Match` del navegador
+    coincide con la versión actual y, si no, añade el ETag a la respuesta normal.
+    El ETag se calcula ANTES de ejecutar la vista: si alguien escribe mientras tanto,
+    la respuesta lleva la versión antigua y la siguiente petición se regenera.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = build_etag(scopes, daily=daily)
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            # 'no-cache' = el navegador puede guardarla, pero debe preguntar siempre si sigue valiendo
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """Lee las versiones al arrancar y las comprueba al principio de cada petición a la API."""
+    from app.core.db import get_db
+
+    @app.before_request
+    def sync_before_api_request():
+        # Solo las APIs (blueprints) usan las cachés; los MP3, portadas y estáticos no
+        if request.blueprint:
+            sync_versions(get_db())
+
+    with app.app_context():
+        try:
+            reset_versions(get_db())
+        except sqlite3.Error as e:
+            # Base de datos sin inicializar: se leerán cuando exista
+            print(f"No se pudieron leer las versiones de los datos: {e}")
@@ -1,110 +1,110 @@
-# app/core/yt.py
-# Este archivo está intencionadamente simplificado para cumplir con
-# los requisitos de distribución. Las funciones de descarga han sido eliminadas.
-
-def extract_urls_from_playlist(playlist_url):
-    """
-    Devuelve la URL original en una lista, ya que la funcionalidad
-    de expansión de playlists ha sido desactivada.
-    """
-    # Simplemente devolvemos la URL que nos dan dentro de una lista.
-    return [playlist_url]
-
-def download_audio(url, quality_kbps, progress_hook):
-    """
-    Esta función está desactivada. Lanza un error para indicar
-    que la descarga no es posible.
-    """
-    # Lanzamos un error para que el worker sepa que la operación no está permitida.
-    raise NotImplementedError("La funcionalidad de descarga está desactivada en esta versión.")
-
-
-"""
-Módulo: yt.py
--------------
-Este módulo se encarga de la interacción con servicios externos de vídeo
-(por ejemplo, YouTube) para dos tareas principales:
-
-1. Identificar si una URL corresponde a un vídeo único o a una playlist.
-   - En el caso de playlists, se deben expandir a todas las URLs de vídeos que contenga.
-   - En el caso de un vídeo único, simplemente se devuelve la URL original en una lista.
-
-2. Descargar el audio de un vídeo individual en formato MP3.
-   - Se utiliza un directorio temporal para almacenar el archivo.
-   - Se convierte el audio descargado al bitrate deseado (ej. 128, 192, 256 kbps).
-   - Se pueden incluir metadatos y la miniatura incrustada en el MP3 final.
-   - Durante la descarga se debe informar del progreso mediante una función callback.
-
-Dependencias habituales:
-- yt_dlp: librería para extraer información y descargar streams.
-- tempfile y os: manejo de directorios y rutas temporales.
-- logging: registro de actividad y errores.
-- ffmpeg (a través de yt_dlp): para la conversión y postprocesado.
-
--------------------------------------------------------------
-Función: extract_urls_from_playlist(playlist_url)
--------------------------------------------------------------
-Entrada:
-- playlist_url (str): Una URL que puede apuntar a un vídeo único o a una playlist.
-
-Proceso:
-- Crear un objeto de descarga con opciones de extracción en modo "flat" 
-  (sin descargar contenido, solo metadatos).
-- Llamar al método de extracción sobre la URL.
-- Si el resultado contiene 'entries', significa que es una playlist:
-    - Iterar sobre cada entrada y obtener su URL.
-    - Devolver una lista con todas las URLs de vídeos de la playlist.
-- Si no contiene 'entries', es un vídeo único:
-    - Devolver una lista con la URL original.
-- Manejar errores:
-    - En caso de fallo, registrar un log de error.
-    - Devolver la URL original en una lista para que el sistema muestre el error al usuario.
-
-Salida:
-- list[str]: lista de URLs de vídeos (1 o más).
-
--------------------------------------------------------------
-Función: download_audio(url, quality_kbps, progress_hook)
--------------------------------------------------------------
-Entrada:
-- url (str): URL del vídeo a procesar.
-- quality_kbps (str/int): Bitrate deseado para el MP3 (ej. "192").
-- progress_hook (callable): Función que recibe el estado de la descarga 
-  (ej. progreso en porcentaje, estado 'downloading' o 'finished').
-
-Proceso:
-- Crear un directorio temporal donde guardar la descarga.
-- Configurar opciones de yt_dlp:
-    - Formato: mejor audio disponible.
-    - Plantilla de salida: usar el título como nombre del archivo.
-    - noplaylist=True: asegurarse de que solo se procesa un vídeo, no listas.
-    - Postprocesadores:
-        - FFmpegExtractAudio: convertir a MP3 con el bitrate indicado.
-        - FFmpegMetadata: incrustar metadatos básicos.
-        - EmbedThumbnail: incrustar la miniatura como portada.
-    - writethumbnail=True: guardar miniatura para usar en el MP3.
-    - progress_hooks=[progress_hook]: registrar progreso en la app.
-- Ejecutar la extracción con yt_dlp.
-- Determinar el nombre del archivo resultante y actualizarlo con extensión .mp3.
-- Añadir esa ruta al diccionario de información (ej. 'final_filepath').
-- Registrar logs de inicio y finalización.
-
-Salida:
-- dict: Información sobre el vídeo descargado, incluyendo ruta al archivo MP3 final.
-
-Errores:
-- Si algo falla en la extracción o conversión, se registra en logs y se lanza excepción.
-
--------------------------------------------------------------
-Notas de diseño:
--------------------------------------------------------------
-- Este módulo está pensado para ser llamado desde un worker de descargas
-  (ej. en downloads.py) que gestiona colas y estado.
-- Se diseñó para ser modular, por lo que se podría sustituir yt_dlp por 
-  otra librería de extracción sin alterar la arquitectura.
-- Todo el trabajo con rutas temporales permite aislar cada descarga
-  y limpiar directorios al terminar.
-- Este archivo no contiene implementación ejecutable en el repositorio público 
-  por motivos de licencia, pero la lógica se describe con detalle suficiente
-  para ser recreada fácilmente por un desarrollador.
-"""
+# app/core/yt.py
+# Este archivo está intencionadamente simplificado para cumplir con
+# los requisitos de distribución. Las funciones de descarga han sido eliminadas.
+
+def extract_urls_from_playlist(playlist_url):
+    """
+    Devuelve la URL original en una lista, ya que la funcionalidad
+    de expansión de playlists ha sido desactivada.
+    """
+    # Simplemente devolvemos la URL que nos dan dentro de una lista.
+    return [playlist_url]
+
+def download_audio(url, quality_kbps, progress_hook):
+    """
+    Esta función está desactivada. Lanza un error para indicar
+    que la descarga no es posible.
+    """
+    # Lanzamos un error para que el worker sepa que la operación no está permitida.
+    raise NotImplementedError("La funcionalidad de descarga está desactivada en esta versión.")
+
+
+"""
+Módulo: yt.py
+-------------
+Este módulo se encarga de la interacción con servicios externos de vídeo
+(por ejemplo, YouTube) para dos tareas principales:
+
+1. Identificar si una URL corresponde a un vídeo único o a una playlist.
+   - En el caso de playlists, se deben expandir a todas las URLs de vídeos que contenga.
+   - En el caso de un vídeo único, simplemente se devuelve la URL original en una lista.
+
+2. Descargar el audio de un vídeo individual en formato MP3.
+   - Se utiliza un directorio temporal para almacenar el archivo.
+   - Se convierte el audio descargado al bitrate deseado (ej. 128, 192, 256 kbps).
+   - Se pueden incluir metadatos y la miniatura incrustada en el MP3 final.
+   - Durante la descarga se debe informar del progreso mediante una función callback.
+
+Dependencias habituales:
+- yt_dlp: librería para extraer información y descargar streams.
+- tempfile y os: manejo de directorios y rutas temporales.
+- logging: registro de actividad y errores.
+- ffmpeg (a través de yt_dlp): para la conversión y postprocesado.
+
+-------------------------------------------------------------
+Función: extract_urls_from_playlist(playlist_url)
+-------------------------------------------------------------
+Entrada:
+- playlist_url (str): Una URL que puede apuntar a un vídeo único o a una playlist.
+
+Proceso:
+- Crear un objeto de descarga con opciones de extracción en modo "flat" 
+  (sin descargar contenido, solo metadatos).
+- Llamar al método de extracción sobre la URL.
+- Si el resultado contiene 'entries', significa que es una playlist:
+    - Iterar sobre cada entrada y obtener su URL.
+    - Devolver una lista con todas las URLs de vídeos de la playlist.
+- Si no contiene 'entries', es un vídeo único:
+    - Devolver una lista con la URL original.
+- Manejar errores:
+    - En caso de fallo, registrar un log de error.
+    - Devolver la URL original en una lista para que el sistema muestre el error al usuario.
+
+Salida:
+- list[str]: lista de URLs de vídeos (1 o más).
+
+-------------------------------------------------------------
+Función: download_audio(url, quality_kbps, progress_hook)
+-------------------------------------------------------------
+Entrada:
+- url (str): URL del vídeo a procesar.
+- quality_kbps (str/int): Bitrate deseado para el MP3 (ej. "192").
+- progress_hook (callable): Función que recibe el estado de la descarga 
+  (ej. progreso en porcentaje, estado 'downloading' o 'finished').
+
+Proceso:
+- Crear un directorio temporal donde guardar la descarga.
+- Configurar opciones de yt_dlp:
+    - Formato: mejor audio disponible.
+    - Plantilla de salida: usar el título como nombre del archivo.
+    - noplaylist=True: asegurarse de que solo se procesa un vídeo, no listas.
+    - Postprocesadores:
+        - FFmpegExtractAudio: convertir a MP3 con el bitrate indicado.
+        - FFmpegMetadata: incrustar metadatos básicos.
+        - EmbedThumbnail: incrustar la miniatura como portada.
+    - writethumbnail=True: guardar miniatura para usar en el MP3.
+    - progress_hooks=[progress_hook]: registrar progreso en la app.
+- Ejecutar la extracción con yt_dlp.
+- Determinar el nombre del archivo resultante y actualizarlo con extensión .mp3.
+- Añadir esa ruta al diccionario de información (ej. 'final_filepath').
+- Registrar logs de inicio y finalización.
+
+Salida:
+- dict: Información sobre el vídeo descargado, incluyendo ruta al archivo MP3 final.
+
+Errores:
+- Si algo falla en la extracción o conversión, se registra en logs y se lanza excepción.
+
+-------------------------------------------------------------
+Notas de diseño:
+-------------------------------------------------------------
+- Este módulo está pensado para ser llamado desde un worker de descargas
+  (ej. en downloads.py) que gestiona colas y estado.
+- Se diseñó para ser modular, por lo que se podría sustituir yt_dlp por 
+  otra librería de extracción sin alterar la arquitectura.
+- Todo el trabajo con rutas temporales permite aislar cada descarga
+  y limpiar directorios al terminar.
+- Este archivo no contiene implementación ejecutable en el repositorio público 
+  por motivos de licencia, pero la lógica se describe con detalle suficiente
+  para ser recreada fácilmente por un desarrollador.
+"""
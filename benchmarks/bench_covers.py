@@ -0,0 +1,160 @@
+# benchmarks/bench_covers.py
+"""
+Micro-benchmark: procesado de portadas.
+
+Compara el bloque que se usaba antes en cada endpoint (abrir, thumbnail(500), RGB y JPEG
+calidad 85) con el mismo bloque usando open_cover (decodificación reducida de los JPEG) y
+con process_cover_variants de app/core/covers.py (lo que se hace ahora: las seis variantes). Mide el tiempo por portada y el pico de memoria del
+proceso; cada caso se ejecuta en un proceso nuevo para que los picos no se mezclen (en Linux
+un proceso hijo hereda el pico de memoria del padre, así que el padre no toca ninguna imagen).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_covers                     # genera JPEG sintéticos de 3000x3000
+    python -m benchmarks.bench_covers C:/Portadas         # usa tus propias imágenes (jpg/png)
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from app.core.covers import open_cover, process_cover_variants
+
+IMAGE_PATTERNS = ('*.jpg', '*.jpeg', '*.png', '*.webp')
+
+
+def make_synthetic_covers(folder, count, cover_px):
+    """Crea `count` JPEG de cover_px x cover_px (ruido, que es lo que peor se comprime)."""
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f'bench_{i:04d}.jpg')
+        Image.effect_noise((cover_px, cover_px), 32 + i).convert('RGB').save(path, 'JPEG', quality=90)
+        paths.append(path)
+    return paths
+
+
+def previous_block(image_data):
+    """El procesado de antes, tal cual estaba copiado en cada endpoint."""
+    img = Image.open(io.BytesIO(image_data))
+    img.thumbnail((500, 500))
+    img = img.convert('RGB')
+    output_buffer = io.BytesIO()
+    img.save(output_buffer, format='JPEG', quality=85)
+    return output_buffer.getvalue()
+
+
+def reduced_block(image_data):
+    """Lo mismo que el bloque anterior, pero abriendo la imagen con open_cover."""
+    img = open_cover(image_data)
+    output_buffer = io.BytesIO()
+    img.save(output_buffer, format='JPEG', quality=85)
+    return output_buffer.getvalue()
+
+
+CASES = {
+    'anterior': previous_block,
+    'reducido': reduced_block,
+    'servicio': process_cover_variants,
+}
+
+
+def peak_memory_mb():
+    """Pico de memoria residente del proceso en MB (None si no se puede medir aquí)."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil  # En Windows
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(case, paths, rounds):
+    """Ejecuta un caso en este proceso e imprime el resultado en JSON."""
+    images = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            images.append(f.read())
+    func = CASES[case]
+    baseline = peak_memory_mb()
+
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for image_data in images:
+            func(image_data)
+        results.append((time.perf_counter() - start) * 1000 / len(images))
+
+    peak = peak_memory_mb()
+    print(json.dumps({
+        'ms': statistics.median(results),
+        'peak_mb': None if peak is None else peak - baseline,
+    }))
+
+
+def run_child(*args):
+    """Ejecuta este script en un proceso nuevo y devuelve la última línea que imprime."""
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_covers', *args],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return output.strip().splitlines()[-1]
+
+
+def measure(case, paths, rounds):
+    """Lanza un caso en un proceso nuevo y devuelve {'ms', 'peak_mb'}."""
+    return json.loads(run_child('--case', case, '--rounds', str(rounds), *paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='*', help='Carpeta con imágenes reales (si no, se generan)')
+    parser.add_argument('--files', type=int, default=10, help='Portadas sintéticas a generar')
+    parser.add_argument('--cover-px', type=int, default=3000, help='Lado de la portada sintética')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--case', choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument('--generate', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.generate:
+        # Proceso hijo: genera las portadas sintéticas en la carpeta indicada
+        print(json.dumps(make_synthetic_covers(args.generate, args.files, args.cover_px)))
+        return
+    if args.case:
+        # Proceso hijo: `inputs` son ya las rutas de las imágenes
+        run_case(args.case, args.inputs, args.rounds)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.inputs:
+            paths = sorted(
+                path for pattern in IMAGE_PATTERNS for path in glob.glob(os.path.join(args.inputs[0], pattern))
+            )
+        else:
+            paths = json.loads(run_child('--generate', tmp, '--files', str(args.files), '--cover-px', str(args.cover_px)))
+        if not paths:
+            print('No se encontraron imágenes.')
+            return
+
+        results = {case: measure(case, paths, args.rounds) for case in CASES}
+
+    print(f'Portadas: {len(paths)}  rondas: {args.rounds}')
+    for case, result in results.items():
+        peak = 'n/d' if result['peak_mb'] is None else f"{result['peak_mb']:.1f} MB"
+        print(f"{case:<10} {result['ms']:8.2f} ms/portada   pico de memoria: +{peak}")
+    print(f"Mejora de la decodificación reducida: x{results['anterior']['ms'] / results['reducido']['ms']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
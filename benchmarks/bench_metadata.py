@@ -0,0 +1,103 @@
+# benchmarks/bench_metadata.py
+"""
+Micro-benchmark: lectura de etiquetas al importar.
+
+Compara el camino antiguo (extract_metadata_from_mp3 + get_cover_from_mp3, dos análisis
+del mismo archivo) con read_tags (una sola pasada).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_metadata                 # genera MP3 sintéticos
+    python -m benchmarks.bench_metadata C:/Musica/Album # usa tus propios MP3
+"""
+import argparse
+import glob
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from mutagen.id3 import ID3, TIT2, TPE1, TALB, TDRC, APIC
+from PIL import Image
+
+from app.core.metadata import extract_metadata_from_mp3, get_cover_from_mp3, read_tags
+
+# Cabecera de un frame MPEG-1 Layer III a 128 kbps / 44.1 kHz seguida de silencio (417 bytes)
+SILENT_FRAME = b'\xff\xfb\x90\x64' + b'\x00' * 413
+
+
+def make_synthetic_mp3s(folder, count, seconds, cover_px):
+    """Crea `count` MP3 de `seconds` segundos con una portada JPEG de cover_px x cover_px."""
+    frames = int(seconds * 44100 / 1152)
+    cover = io.BytesIO()
+    Image.effect_noise((cover_px, cover_px), 64).convert('RGB').save(cover, 'JPEG', quality=90)
+
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f'bench_{i:04d}.mp3')
+        with open(path, 'wb') as f:
+            f.write(SILENT_FRAME * frames)
+        tags = ID3()
+        tags.add(TIT2(encoding=3, text=f'Canción {i}'))
+        tags.add(TPE1(encoding=3, text='Artista'))
+        tags.add(TALB(encoding=3, text='Álbum'))
+        tags.add(TDRC(encoding=3, text='2024'))
+        tags.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='Cover', data=cover.getvalue()))
+        tags.save(path)
+        paths.append(path)
+    return paths
+
+
+def two_pass(path):
+    extract_metadata_from_mp3(path)
+    get_cover_from_mp3(path)
+
+
+def single_pass(path):
+    read_tags(path)
+
+
+def measure(func, paths, rounds):
+    """Devuelve los milisegundos por archivo de cada ronda."""
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        results.append((time.perf_counter() - start) * 1000 / len(paths))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', nargs='?', help='Carpeta con MP3 reales (si no, se generan)')
+    parser.add_argument('--files', type=int, default=50, help='MP3 sintéticos a generar')
+    parser.add_argument('--seconds', type=int, default=240, help='Duración de cada MP3 sintético')
+    parser.add_argument('--cover-px', type=int, default=1400, help='Lado de la portada sintética')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.folder:
+            paths = sorted(glob.glob(os.path.join(args.folder, '*.mp3')))
+        else:
+            paths = make_synthetic_mp3s(tmp, args.files, args.seconds, args.cover_px)
+        if not paths:
+            print('No se encontraron MP3.')
+            return
+
+        # Una pasada de calentamiento para que ambos caminos lean de la caché del sistema
+        measure(two_pass, paths, 1)
+
+        old = measure(two_pass, paths, args.rounds)
+        new = measure(single_pass, paths, args.rounds)
+
+    old_ms, new_ms = statistics.median(old), statistics.median(new)
+    print(f'Archivos: {len(paths)}  rondas: {args.rounds}')
+    print(f'Dos pasadas (extract_metadata_from_mp3 + get_cover_from_mp3): {old_ms:.3f} ms/archivo')
+    print(f'Una pasada (read_tags):                                       {new_ms:.3f} ms/archivo')
+    print(f'Mejora: x{old_ms / new_ms:.2f}')
+
+
+if __name__ == '__main__':
+    main()
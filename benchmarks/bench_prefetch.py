@@ -0,0 +1,91 @@
+# benchmarks/bench_prefetch.py
+"""
+Micro-benchmark: precarga de la siguiente canción (app/core/prefetch.py).
+
+Mide lo que tarda en leerse el principio de un MP3 (lo que el navegador necesita para
+empezar a sonar) en dos casos:
+- sin precarga: el archivo no está en la caché de páginas del sistema;
+- con precarga: se llama a warm_file y se espera `--gap` segundos (la canción anterior
+  sigue sonando mientras el kernel lee la siguiente) antes de leer.
+Antes de cada medida el archivo se saca de la caché con posix_fadvise(DONTNEED), así que
+solo funciona en Linux (macOS no tiene posix_fadvise). Los resultados dependen del disco:
+en un SSD la diferencia es pequeña; en un disco duro o un NAS es donde se nota.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_prefetch                       # genera archivos en una carpeta temporal
+    python -m benchmarks.bench_prefetch /mnt/nas/aeryu/media   # usa tus MP3 (en el disco que importa)
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from app.core.prefetch import warm_file
+
+# Lo que se lee de cada archivo: el principio del MP3
+FIRST_BYTES = 256 * 1024
+
+
+def make_files(folder, count, size_mb):
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f'bench_{i:04d}.mp3')
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size_mb * 1024 * 1024))
+            f.flush()
+            os.fsync(f.fileno())
+        paths.append(path)
+    return paths
+
+
+def evict(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def time_first_bytes(path):
+    start = time.perf_counter()
+    with open(path, 'rb', buffering=0) as f:
+        f.read(FIRST_BYTES)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', nargs='?', help='Carpeta con MP3 (por defecto se generan archivos)')
+    parser.add_argument('--count', type=int, default=20, help='Archivos generados (sin carpeta)')
+    parser.add_argument('--size-mb', type=int, default=8, help='Tamaño de cada archivo generado')
+    parser.add_argument('--gap', type=float, default=0.5, help='Segundos entre la precarga y la lectura')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'posix_fadvise'):
+        sys.exit('Este benchmark necesita posix_fadvise (solo Linux).')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = sorted(glob.glob(os.path.join(args.folder, '*.mp3'))) if args.folder else make_files(tmp, args.count, args.size_mb)
+        if not paths:
+            sys.exit('No hay archivos .mp3 en esa carpeta.')
+
+        cold, warm = [], []
+        for path in paths:
+            evict(path)
+            cold.append(time_first_bytes(path))
+
+            evict(path)
+            warm_file(path)
+            time.sleep(args.gap)
+            warm.append(time_first_bytes(path))
+
+    print(f"{len(paths)} archivos, primeros {FIRST_BYTES // 1024} KB de cada uno")
+    for name, times in (('sin precarga', cold), ('con precarga', warm)):
+        print(f"  {name:<13} mediana {statistics.median(times) * 1000:8.3f} ms   máx {max(times) * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()